@@ -0,0 +1,145 @@
+from board import BoardState, PIECE_TYPES
+
+
+class BitboardBoardState(BoardState):
+    """
+    BoardState backend that mirrors the board in integer bitboards.
+    Cell (row, col) is bit row * board_size + col. The occupancy masks (per player and per piece type)
+    only track the topmost piece of every cell; the stacks themselves still live in `board`.
+    """
+
+    def __init__(self, board_size):
+        super().__init__(board_size)
+        cell_count = board_size * board_size
+
+        self.occupied = 0
+        self.player_occupancy = [0, 0]  # Cells whose top piece belongs to Player 1 / Player 2
+        self.piece_occupancy = {piece_type: 0 for piece_type in PIECE_TYPES}  # Cells by top piece type
+
+        # Neighbor lists and masks are built once, get_neighbors just indexes them
+        self.neighbor_table = []
+        self.neighbor_masks = []
+        for index in range(cell_count):
+            neighbors = BoardState.get_neighbors(self, index // board_size, index % board_size)
+            mask = 0
+            for nr, nc in neighbors:
+                mask |= 1 << (nr * board_size + nc)
+            self.neighbor_table.append(neighbors)
+            self.neighbor_masks.append(mask)
+
+        # Column masks used to shift a whole bitboard one hex step in each direction
+        self.full_mask = (1 << cell_count) - 1
+        self.even_cols_mask = 0
+        self.not_first_col_mask = 0
+        self.not_last_col_mask = 0
+        for index in range(cell_count):
+            col = index % board_size
+            if col % 2 == 0:
+                self.even_cols_mask |= 1 << index
+            if col != 0:
+                self.not_first_col_mask |= 1 << index
+            if col != board_size - 1:
+                self.not_last_col_mask |= 1 << index
+        self.odd_cols_mask = self.full_mask & ~self.even_cols_mask
+
+
+    def get_neighbors(self, row, col):
+        """Get the neighbors of a given hex cell (precomputed)."""
+        return self.neighbor_table[row * self.board_size + col]
+
+
+    def _cell_changed(self, row, col, previous_top, new_top):
+        """Move the cell's bits from its previous top piece to its new top piece, then update the derived state."""
+        bit = 1 << (row * self.board_size + col)
+        if previous_top is not None:
+            self.occupied &= ~bit
+            self.player_occupancy[0 if previous_top[0] == "Player 1" else 1] &= ~bit
+            self.piece_occupancy[previous_top[1]] &= ~bit
+        if new_top is not None:
+            self.occupied |= bit
+            self.player_occupancy[0 if new_top[0] == "Player 1" else 1] |= bit
+            self.piece_occupancy[new_top[1]] |= bit
+        super()._cell_changed(row, col, previous_top, new_top)
+
+
+    def _classify_cell(self, row, col):
+        """Recompute the frontier/placeable status of a cell from the neighbor mask."""
+        cell = (row, col)
+        self.frontier.discard(cell)
+        self.placeable[0].discard(cell)
+        self.placeable[1].discard(cell)
+        index = row * self.board_size + col
+        if self.occupied >> index & 1:
+            return
+
+        mask = self.neighbor_masks[index]
+        touches_player_1 = mask & self.player_occupancy[0]
+        touches_player_2 = mask & self.player_occupancy[1]
+        if touches_player_1 or touches_player_2:
+            self.frontier.add(cell)
+            if not touches_player_2:
+                self.placeable[0].add(cell)
+            elif not touches_player_1:
+                self.placeable[1].add(cell)
+
+
+    def dilate(self, bits):
+        """Get every cell adjacent to at least one cell of `bits`."""
+        size = self.board_size
+        even = bits & self.even_cols_mask
+        odd = bits & self.odd_cols_mask
+        grown = (bits >> size) | (bits << size)  # Same column, row -1 / +1
+        grown |= (bits & self.not_first_col_mask) >> 1  # Same row, col -1
+        grown |= (bits & self.not_last_col_mask) << 1  # Same row, col +1
+        grown |= (even & self.not_first_col_mask) >> (size + 1)  # Even columns: row -1, col -1
+        grown |= (even & self.not_last_col_mask) >> (size - 1)  # Even columns: row -1, col +1
+        grown |= (odd & self.not_first_col_mask) << (size - 1)  # Odd columns: row +1, col -1
+        grown |= (odd & self.not_last_col_mask) << (size + 1)  # Odd columns: row +1, col +1
+        return grown & self.full_mask
+
+
+    def cells_from_bits(self, bits):
+        """Convert a bitboard into a list of (row, col) cells."""
+        cells = []
+        while bits:
+            lowest = bits & -bits
+            index = lowest.bit_length() - 1
+            cells.append((index // self.board_size, index % self.board_size))
+            bits ^= lowest
+        return cells
+
+
+    def get_attack_origins(self, targets, player):
+        """Get the player's pieces next to a target or Spiders up to three cells away, by dilating the targets."""
+        target_bits = 0
+        for row, col in targets:
+            target_bits |= 1 << (row * self.board_size + col)
+        near = self.dilate(target_bits)
+        reach = self.dilate(self.dilate(near))
+        own = self.player_occupancy[0 if player == "Player 1" else 1]
+        return set(self.cells_from_bits(own & (near | reach & self.piece_occupancy["Spider"])))
+
+
+    def count_neighbor_pieces(self, row, col, piece_types):
+        """Count the neighbors of a cell whose top piece is one of piece_types, per player (Player 1, Player 2)."""
+        mask = self.neighbor_masks[row * self.board_size + col]
+        typed = 0
+        for piece_type in piece_types:
+            typed |= self.piece_occupancy[piece_type]
+        mask &= typed
+        return [(mask & self.player_occupancy[0]).bit_count(), (mask & self.player_occupancy[1]).bit_count()]
+
+
+    def count_occupied_neighbors(self, row, col, exclude=None):
+        """Count the occupied neighbors of a cell, optionally ignoring one neighboring cell."""
+        occupied = self.occupied
+        if exclude is not None:
+            occupied &= ~(1 << (exclude[0] * self.board_size + exclude[1]))
+        return (self.neighbor_masks[row * self.board_size + col] & occupied).bit_count()
+
+
+    def touches_only_player(self, row, col, player):
+        """Check that every occupied neighbor of a cell has one of the player's pieces on top."""
+        opponent_index = 1 if player == "Player 1" else 0
+        return not self.neighbor_masks[row * self.board_size + col] & self.player_occupancy[opponent_index]
+
@@ -1,5 +1,10 @@
 from typing import Optional, List, Tuple
 
+from perimeter import PerimeterGraph
+
+PIECE_TYPES = ("Bee", "Ant", "Spider", "Grasshopper", "Beetle")
+
+
 class BoardState:
     def __init__(self, board_size):
         self.board_size: int = board_size
@@ -8,6 +13,13 @@ class BoardState:
             [None for _ in range(board_size)] for _ in range(board_size)
         ]
         self.pieces_on_board = [[], []]
+        # Cells whose single piece is pinned by the one hive rule, rebuilt lazily after the board changes
+        self._articulation_points = None
+        # Slide graph shared by the Bee, Ant and Spider, rebuilt lazily after the board changes
+        self._perimeter_graph = None
+        # Empty cells touching the hive, and those of them touching only Player 1's / Player 2's top pieces
+        self.frontier = set()
+        self.placeable = [set(), set()]
         # TODO (General):
         #   if a player cant place a new piece, pass his role
         #   Add final state -> draw(not just win or lose)
@@ -32,9 +44,220 @@ class BoardState:
         return self.board[row][col] is not None
 
 
+    def get_top_piece(self, row, col):
+        """Get the topmost piece of a cell (None if the cell is empty)."""
+        cell_content = self.board[row][col]
+        if isinstance(cell_content, list):
+            return cell_content[-1] if cell_content else None
+        return cell_content
+
+
+    def get_stack_height(self, row, col):
+        """Get the number of pieces stacked on a cell."""
+        cell_content = self.board[row][col]
+        if isinstance(cell_content, list):
+            return len(cell_content)
+        return 0 if cell_content is None else 1
+
+
+    def push_piece(self, row, col, piece):
+        """
+        Put a piece on top of a cell, turning the cell into a stack if it is occupied.
+        Every change to the board goes through push_piece/pop_piece so backends can track it.
+        """
+        cell_content = self.board[row][col]
+        previous_top = self.get_top_piece(row, col)
+        if isinstance(cell_content, list):
+            cell_content.append(piece)  # Add to the stack
+        elif cell_content is None:
+            self.board[row][col] = piece
+        else:
+            self.board[row][col] = [cell_content, piece]  # Convert to stack
+        player_index = 0 if piece[0] == "Player 1" else 1
+        self.pieces_on_board[player_index].append((row, col, piece[1]))
+        self._cell_changed(row, col, previous_top, piece)
+
+
+    def pop_piece(self, row, col):
+        """Remove and return the topmost piece of a cell."""
+        cell_content = self.board[row][col]
+        if isinstance(cell_content, list):
+            piece = cell_content.pop(-1)  # Remove the top piece
+            if len(cell_content) == 1:
+                self.board[row][col] = cell_content[0]  # Convert to single element
+            elif len(cell_content) == 0:
+                self.board[row][col] = None
+        else:
+            piece = cell_content
+            self.board[row][col] = None
+        player_index = 0 if piece[0] == "Player 1" else 1
+        self.pieces_on_board[player_index].remove((row, col, piece[1]))
+        self._cell_changed(row, col, piece, self.get_top_piece(row, col))
+        return piece
+
+
+    def _cell_changed(self, row, col, previous_top, new_top):
+        """Update the derived state after the top piece of a cell changed."""
+        self._articulation_points = None
+        self._perimeter_graph = None
+        # Only the cell itself and its neighbors can change frontier/placeable status
+        self._classify_cell(row, col)
+        for neighbor in self.get_neighbors(row, col):
+            self._classify_cell(*neighbor)
+
+
+    def _classify_cell(self, row, col):
+        """Recompute whether a cell belongs to the frontier and to each player's placeable set."""
+        cell = (row, col)
+        self.frontier.discard(cell)
+        self.placeable[0].discard(cell)
+        self.placeable[1].discard(cell)
+        if self.board[row][col] is not None:
+            return
+
+        touches_player_1 = touches_player_2 = False
+        for neighbor in self.get_neighbors(row, col):
+            top_piece = self.get_top_piece(*neighbor)
+            if top_piece is None:
+                continue
+            if top_piece[0] == "Player 1":
+                touches_player_1 = True
+            else:
+                touches_player_2 = True
+
+        if touches_player_1 or touches_player_2:
+            self.frontier.add(cell)
+            if not touches_player_2:
+                self.placeable[0].add(cell)
+            elif not touches_player_1:
+                self.placeable[1].add(cell)
+
+
+    def count_occupied_neighbors(self, row, col, exclude=None):
+        """Count the occupied neighbors of a cell, optionally ignoring one neighboring cell."""
+        count = 0
+        for neighbor in self.get_neighbors(row, col):
+            if neighbor != exclude and self.board[neighbor[0]][neighbor[1]] is not None:
+                count += 1
+        return count
+
+
+    def count_neighbor_pieces(self, row, col, piece_types):
+        """Count the neighbors of a cell whose top piece is one of piece_types, per player (Player 1, Player 2)."""
+        counts = [0, 0]
+        for neighbor in self.get_neighbors(row, col):
+            top_piece = self.get_top_piece(*neighbor)
+            if top_piece is not None and top_piece[1] in piece_types:
+                counts[0 if top_piece[0] == "Player 1" else 1] += 1
+        return counts
+
+
+    def get_attack_origins(self, targets, player):
+        """
+        Get the cells of the player's top pieces that may reach one of the target cells in one move, without
+        generating any move: the pieces next to a target, and the Spiders up to three cells away.
+        Ants and Grasshoppers further away are left out even though they may reach a target.
+        """
+        near = set()
+        for cell in targets:
+            near.update(self.get_neighbors(*cell))
+        reach = set(near)
+        for _ in range(2):  # Spiders walk exactly three cells
+            reach.update(neighbor for cell in list(reach) for neighbor in self.get_neighbors(*cell))
+        origins = set()
+        for cell in reach:
+            top_piece = self.get_top_piece(*cell)
+            if top_piece is not None and top_piece[0] == player and (cell in near or top_piece[1] == "Spider"):
+                origins.add(cell)
+        return origins
+
+
+    def touches_only_player(self, row, col, player):
+        """Check that every occupied neighbor of a cell has one of the player's pieces on top."""
+        for neighbor in self.get_neighbors(row, col):
+            top_piece = self.get_top_piece(*neighbor)
+            if top_piece is not None and top_piece[0] != player:
+                return False
+        return True
+
+
+    def get_empty_neighbors(self):
+        """Get all empty cells that touch the hive."""
+        return set(self.frontier)
+
+
+    def get_articulation_points(self):
+        """
+        Get the occupied cells whose removal would split the hive (Tarjan's algorithm).
+        The result is cached until the next push_piece/pop_piece.
+        """
+        if self._articulation_points is None:
+            self._articulation_points = self._find_articulation_points()
+        return self._articulation_points
+
+
+    def get_perimeter_graph(self):
+        """Get the slide graph of the current position, shared by every sliding piece."""
+        if self._perimeter_graph is None:
+            self._perimeter_graph = PerimeterGraph(self)
+        return self._perimeter_graph
+
+
+    def _find_articulation_points(self):
+        """Run an iterative Tarjan DFS over the occupied cells."""
+        cells = {(row, col) for player_pieces in self.pieces_on_board for row, col, _ in player_pieces}
+        if len(cells) < 3:
+            return set()
+
+        start = next(iter(cells))
+        discovery = {start: 0}
+        low = {start: 0}
+        points = set()
+        root_children = 0
+        stack = [(start, None, iter(self.get_neighbors(*start)))]
+
+        while stack:
+            cell, parent, neighbors = stack[-1]
+            descended = False
+            for neighbor in neighbors:
+                if neighbor not in cells:
+                    continue
+                if neighbor not in discovery:
+                    discovery[neighbor] = low[neighbor] = len(discovery)
+                    stack.append((neighbor, cell, iter(self.get_neighbors(*neighbor))))
+                    descended = True
+                    break
+                if neighbor != parent:
+                    low[cell] = min(low[cell], discovery[neighbor])
+            if descended:
+                continue
+
+            # All neighbors explored, propagate the low-link to the parent
+            stack.pop()
+            if parent is None:
+                continue
+            low[parent] = min(low[parent], low[cell])
+            if parent == start:
+                root_children += 1
+            elif low[cell] >= discovery[parent]:
+                points.add(parent)
+
+        # The DFS root is an articulation point only if it has more than one subtree
+        if root_children > 1:
+            points.add(start)
+        return points
+
+
+    def is_pinned(self, row, col):
+        """Check if lifting the top piece of a cell would break the hive."""
+        return self.get_stack_height(row, col) == 1 and (row, col) in self.get_articulation_points()
+
+
     def is_hive_intact_after_move(self, origin, destination, piece=None):
         """
         Ensure the hive remains intact after moving or placing a piece.
+        A move keeps the hive intact when the piece is not pinned at its origin and the
+        destination still touches the rest of the hive.
         Args:
             origin: The original position of the piece (None for placements).
             destination: The target position for the piece.
@@ -42,49 +265,20 @@ class BoardState:
         Returns:
             True if the hive remains intact; False otherwise.
         """
-        # Create a simulated list of all pieces on the board
-        simulated_pieces_on_board = list(self.pieces_on_board[0] + self.pieces_on_board[1])
-
+        vacated = None
+        remaining_pieces = len(self.pieces_on_board[0]) + len(self.pieces_on_board[1])
         if origin:
-            origin_content = self.board[origin[0]][origin[1]]
-            if isinstance(origin_content, list):  # Handle stacks
-                piece_to_move = origin_content[-1]  # Simulate removing the topmost piece
-                if len(origin_content) == 1:
-                    simulated_pieces_on_board.remove((origin[0], origin[1], piece_to_move[1]))
-            else:
-                piece_to_move = origin_content
-                simulated_pieces_on_board.remove((origin[0], origin[1], piece_to_move[1]))
-        else:
-            piece_to_move = piece
+            if self.is_pinned(*origin):
+                return False
+            if self.get_stack_height(*origin) == 1:
+                vacated = origin  # The origin cell is left empty
+            remaining_pieces -= 1
 
-        # Simulate placing the piece in the destination
-        simulated_pieces_on_board.append((destination[0], destination[1], piece_to_move[1]))
-
-        # If only one piece is on the board, the hive is intact
-        if len(simulated_pieces_on_board) == 1:
+        # Climbing on top of the hive or landing next to it keeps it connected
+        if self.board[destination[0]][destination[1]] is not None:
+            return True
+        if self.count_occupied_neighbors(destination[0], destination[1], exclude=vacated) > 0:
             return True
 
-        # Start BFS/DFS from any occupied cell
-        start = simulated_pieces_on_board[0][:2]  # Use the first piece's coordinates
-
-        visited = set()
-        stack = [start]
-
-        while stack:
-            current = stack.pop()
-            if current not in visited:
-                visited.add(current)
-                for neighbor in self.get_neighbors(*current):
-                    if any(neighbor == (piece[0], piece[1]) for piece in
-                            simulated_pieces_on_board) and neighbor not in visited:
-                        stack.append(neighbor)
-
-        # Check if all occupied cells are connected
-        intact = True
-        for piece_info in simulated_pieces_on_board:
-            cell_coords = piece_info[:2]
-            if cell_coords not in visited:
-                intact = False
-                break
-
-        return intact
\ No newline at end of file
+        # Otherwise the piece is only connected if it is the only one on the board
+        return remaining_pieces == 0
@@ -0,0 +1,227 @@
+import math
+from collections import OrderedDict
+
+import tkinter as tk
+from PIL import ImageTk
+
+# Look of a cell without a piece or highlight
+DEFAULT_OUTLINE = ("#7f8c8d", 2)
+# Extra cells drawn around the viewport so scrolling does not show blank borders
+VIEWPORT_MARGIN = 1
+
+
+class SpriteCache:
+    """
+    LRU cache of piece sprites resized for a zoom level, keyed by (piece type, size), so each image is
+    resampled once per zoom level. The least recently used sprites are dropped above max_sprites entries;
+    sized for every zoom level, nothing is ever dropped while the sprites in use are still on the canvas.
+    """
+
+    def __init__(self, original_images, max_sprites):
+        """
+        Args:
+            original_images: Dict of piece type -> full size PIL image.
+            max_sprites: Number of sprites kept, normally the number of zoom levels times the piece types.
+        """
+        self.original_images = original_images
+        self.max_sprites = max_sprites
+        self.sprites = OrderedDict()  # (piece type, size) -> PhotoImage, least recently used first
+
+
+    def get(self, piece_type, size):
+        """Get the sprite of a piece type resized to size x size pixels."""
+        key = (piece_type, size)
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.sprites.move_to_end(key)
+            return sprite
+        sprite = ImageTk.PhotoImage(self.original_images[piece_type].resize((size, size)))
+        self.sprites[key] = sprite
+        while len(self.sprites) > self.max_sprites:
+            self.sprites.popitem(last=False)
+        return sprite
+
+
+    def get_all(self, size):
+        """Get the sprites of every piece type at a size."""
+        return {piece_type: self.get(piece_type, size) for piece_type in self.original_images}
+
+
+class BoardView:
+    """
+    Rendering layer of the board canvas. It keeps the wanted look of every cell (outline and piece image)
+    and the canvas item IDs of the cells that are drawn, so updates are single itemconfig calls instead of
+    tag lookups. Only the cells inside the visible viewport have canvas items; the others are drawn
+    when they are scrolled into view.
+    """
+
+    def __init__(self, canvas: tk.Canvas, board_size, cell_size, images):
+        """
+        Args:
+            canvas: The canvas to draw on.
+            board_size: Number of rows and columns.
+            cell_size: Hexagon radius in pixels.
+            images: Dict of piece type -> PhotoImage drawn for that piece.
+        """
+        self.canvas = canvas
+        self.board_size = board_size
+        self.cell_size = cell_size
+        self.images = images
+        self.outlines = {}  # (row, col) -> (color, width), cells not in it use DEFAULT_OUTLINE
+        self.pieces = {}  # (row, col) -> piece type shown on the cell
+        self.cell_items = {}  # (row, col) -> (polygon ID, label ID) of the drawn cells
+        self.image_items = {}  # (row, col) -> image ID of the drawn pieces
+        self.enabled = True
+        self.refresh_pending = False
+
+
+    def cell_center(self, row, col):
+        """Get the pixel center of a cell (odd columns are shifted down by half a cell)."""
+        x = col * self.cell_size * 1.5
+        y = row * self.cell_size * math.sqrt(3)
+        if col % 2 == 1:
+            y += self.cell_size * math.sqrt(3) / 2
+        return x, y
+
+
+    def pixel_to_cell(self, x, y):
+        """
+        Get the cell under a canvas pixel by converting it to axial hex coordinates and rounding.
+        Returns:
+            (row, col), or None outside the board.
+        """
+        q = x / (self.cell_size * 1.5)
+        r = y / (self.cell_size * math.sqrt(3)) - q / 2
+        # Round the cube coordinates (q, r, -q - r), fixing the one with the largest rounding error
+        rounded_q, rounded_r, rounded_s = round(q), round(r), round(-q - r)
+        q_error, r_error, s_error = abs(rounded_q - q), abs(rounded_r - r), abs(rounded_s + q + r)
+        if q_error > r_error and q_error > s_error:
+            rounded_q = -rounded_r - rounded_s
+        elif r_error > s_error:
+            rounded_r = -rounded_q - rounded_s
+        col = rounded_q
+        row = rounded_r + (col - (col & 1)) // 2
+        if 0 <= row < self.board_size and 0 <= col < self.board_size:
+            return row, col
+        return None
+
+
+    def hexagon_points(self, x, y):
+        """Calculate the six corners of a hexagon centered at (x, y)."""
+        points = []
+        for i in range(6):
+            angle = math.radians(60 * i)
+            points.append(x + self.cell_size * math.cos(angle))
+            points.append(y + self.cell_size * math.sin(angle))
+        return points
+
+
+    def visible_cells(self):
+        """Get the row and column ranges of the cells inside the canvas viewport."""
+        canvas = self.canvas
+        left, top = canvas.canvasx(0), canvas.canvasy(0)
+        right, bottom = left + canvas.winfo_width(), top + canvas.winfo_height()
+        column_width = self.cell_size * 1.5
+        row_height = self.cell_size * math.sqrt(3)
+        first_col = max(0, math.floor(left / column_width) - VIEWPORT_MARGIN)
+        last_col = min(self.board_size - 1, math.ceil(right / column_width) + VIEWPORT_MARGIN)
+        first_row = max(0, math.floor(top / row_height) - VIEWPORT_MARGIN)
+        last_row = min(self.board_size - 1, math.ceil(bottom / row_height) + VIEWPORT_MARGIN)
+        return range(first_row, last_row + 1), range(first_col, last_col + 1)
+
+
+    def schedule_refresh(self, *args):
+        """Refresh once the event loop is idle; bound to the canvas scroll and resize callbacks."""
+        if not self.refresh_pending:
+            self.refresh_pending = True
+            self.canvas.after_idle(self.refresh)
+
+
+    def refresh(self):
+        """Draw the cells that entered the viewport and delete the items of the cells that left it."""
+        self.refresh_pending = False
+        if not self.enabled:
+            return
+        rows, cols = self.visible_cells()
+        visible = {(row, col) for row in rows for col in cols}
+        for cell in [cell for cell in self.cell_items if cell not in visible]:
+            self.canvas.delete(*self.cell_items.pop(cell))
+            if cell in self.image_items:
+                self.canvas.delete(self.image_items.pop(cell))
+        for cell in visible:
+            if cell not in self.cell_items:
+                self.draw_cell(*cell)
+
+
+    def draw_cell(self, row, col):
+        """Create the canvas items of a cell, below the pieces already drawn."""
+        x, y = self.cell_center(row, col)
+        color, width = self.outlines.get((row, col), DEFAULT_OUTLINE)
+        polygon = self.canvas.create_polygon(self.hexagon_points(x, y), outline=color, fill="#ffffff", width=width, tags="cell")
+        # Row and column text (for debugging purposes), slightly above the center
+        label = self.canvas.create_text(x, y - self.cell_size * 0.5 - 12, text=f"{row},{col}", fill="black",
+                                        font=("Segoe UI", 8), tags="label")
+        self.canvas.tag_lower(label)
+        self.canvas.tag_lower(polygon)
+        self.cell_items[(row, col)] = (polygon, label)
+        if (row, col) in self.pieces:
+            self.draw_piece(row, col)
+
+
+    def draw_piece(self, row, col):
+        """Create the image item of the piece shown on a cell."""
+        x, y = self.cell_center(row, col)
+        self.image_items[(row, col)] = self.canvas.create_image(x, y, image=self.images[self.pieces[(row, col)]], tags="piece")
+
+
+    def set_outline(self, row, col, color, width):
+        """Change the outline of a cell."""
+        self.outlines[(row, col)] = (color, width)
+        items = self.cell_items.get((row, col))
+        if items is not None:
+            self.canvas.itemconfig(items[0], outline=color, width=width)
+
+
+    def set_piece(self, row, col, piece_type):
+        """Show a piece on a cell (None shows no piece)."""
+        if (row, col) in self.image_items:
+            self.canvas.delete(self.image_items.pop((row, col)))
+        if piece_type is None:
+            self.pieces.pop((row, col), None)
+            return
+        self.pieces[(row, col)] = piece_type
+        if (row, col) in self.cell_items:
+            self.draw_piece(row, col)
+
+
+    def set_cell_size(self, cell_size, images):
+        """Zoom: redraw the visible cells with a new hexagon radius and the sprites of that size."""
+        self.cell_size = cell_size
+        self.images = images
+        for items in self.cell_items.values():
+            self.canvas.delete(*items)
+        self.canvas.delete(*self.image_items.values())
+        self.cell_items.clear()
+        self.image_items.clear()
+        self.refresh()
+
+
+    def reset(self):
+        """Remove every piece and highlight for a new game, keeping the drawn grid."""
+        self.enabled = True
+        self.canvas.delete(*self.image_items.values())
+        self.image_items.clear()
+        self.pieces.clear()
+        for cell in self.outlines:
+            if cell in self.cell_items:
+                self.canvas.itemconfig(self.cell_items[cell][0], outline=DEFAULT_OUTLINE[0], width=DEFAULT_OUTLINE[1])
+        self.outlines.clear()
+        self.refresh()
+
+
+    def clear(self):
+        """Delete everything from the canvas and stop drawing."""
+        self.enabled = False
+        self.canvas.delete("all")
+        self.cell_items.clear()
+        self.image_items.clear()
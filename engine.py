@@ -1,31 +1,59 @@
 from board import BoardState
 from pieces import Pieces
+from zobrist import get_zobrist_keys
 
 
 class HiveGame:
-    def __init__(self, board_size: int):
-        self.boardState = BoardState(board_size)
+    def __init__(self, board_size: int, board_backend=BoardState):
+        # board_backend is the BoardState class to use (e.g. BitboardBoardState)
+        self.boardState = board_backend(board_size)
 
         self.first_play = True
         self.current_player = "Player 1"
         self.turn_counter = [0, 0]
         self.bee_placed = [False, False]
         self.bee_coordinates = [None, None]
+        # Occupied neighbors around each player's Bee, updated by make_move/undo_move
+        self.bee_threat = [0, 0]
+        # Pieces each player has on the board, and the pseudo-mobility of their top pieces
+        # (see get_step_count), updated by make_move/undo_move so the evaluation only reads them
+        self.piece_count = [0, 0]
+        self.step_mobility = [0, 0]
         self.player_pieces = {
             "Player 1": {"Bee": 1, "Ant": 3, "Spider": 2, "Grasshopper": 3, "Beetle": 2},
             "Player 2": {"Bee": 1, "Ant": 3, "Spider": 2, "Grasshopper": 3, "Beetle": 2}
         }
+        # 64-bit position key, updated incrementally by make_move/undo_move
+        self.zobrist = get_zobrist_keys(board_size)
+        self.zobrist_key = self.zobrist.compute_key(self.boardState, self.player_pieces, self.current_player)
+
+
+    def reset(self):
+        """Start a new game in place, so the objects holding this game (AI, GUI) keep working with it."""
+        self.__init__(self.boardState.board_size, type(self.boardState))
+
+
+    def __getstate__(self):
+        """Copy/pickle the game without the Zobrist key table, which is shared per board size."""
+        state = self.__dict__.copy()
+        del state["zobrist"]
+        return state
+
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.zobrist = get_zobrist_keys(self.boardState.board_size)
 
 
     def get_piece_moves(self, row, col):
         """
         Get valid moves for a specific piece at a given position.
         """
-        piece = self.boardState.board[row][col]
-        if isinstance(piece, list):
-            piece = piece[-1]
+        piece = self.boardState.get_top_piece(row, col)
         if not piece:  # No piece at the position
             return []
+        if self.boardState.is_pinned(row, col):  # Moving the piece would break the hive
+            return []
 
         _, piece_type = piece
         moves = []
@@ -58,7 +86,7 @@ class HiveGame:
         if self.bee_placed[player_index]:
             row, col = self.bee_coordinates[player_index]
             # Check all neighbors; if any are empty, the Bee is not surrounded
-            return all(self.boardState.is_cell_occupied(r, c) for r, c in self.boardState.get_neighbors(row, col))
+            return self.bee_threat[player_index] == len(self.boardState.get_neighbors(row, col))
         return False
 
 
@@ -70,7 +98,8 @@ class HiveGame:
         - The position is not empty.
         - The Queen Bee has not been placed by the 4th turn (if required).
         - The position is adjacent to opponent pieces (except during turn 0).
-        - The hive would break after placement.
+        - The position does not touch the hive (except for the very first piece).
+        The frontier/placeable sets kept by BoardState make every check a lookup.
         """
         # Check if the player still has pieces left
         if self.player_pieces[player][piece] <= 0:
@@ -80,13 +109,10 @@ class HiveGame:
         if self.boardState.board[row][col] is not None:
             return False
 
-        # Temporarily place the piece to check hive integrity
-        self.boardState.board[row][col] = (player, piece)  # Simulate placement
-        is_intact = self.boardState.is_hive_intact_after_move(None, (row, col), piece)
-        self.boardState.board[row][col] = None  # Revert placement
-
-        if not is_intact:
-            return False  # Hive would break with this placement
+        # A placement cannot break the hive, it only has to touch it
+        pieces_on_board = self.boardState.pieces_on_board
+        if (pieces_on_board[0] or pieces_on_board[1]) and (row, col) not in self.boardState.frontier:
+            return False  # Not connected to the hive
 
         # Allow adjacency to opponent pieces during turn 0
         player_index = 0 if player == "Player 1" else 1
@@ -94,19 +120,8 @@ class HiveGame:
             return True  # Turn 0 allows placement anywhere valid if hive is intact
 
         # Check adjacency rules
-        neighbors = self.boardState.get_neighbors(row, col)
-        for neighbor in neighbors:
-            if self.boardState.is_cell_occupied(neighbor[0], neighbor[1]):
-                neighbor_piece = self.boardState.board[neighbor[0]][neighbor[1]]
-
-                if isinstance(neighbor_piece, list):  # If it's a stack
-                    top_piece = neighbor_piece[-1]  # Topmost piece
-                    owner = top_piece[0]  # Owner of the top piece
-                else:  # Single piece
-                    owner = neighbor_piece[0]
-
-                if owner != player:
-                    return False  # Adjacent to an opponent's piece (invalid)
+        if (row, col) not in self.boardState.placeable[player_index]:
+            return False  # Adjacent to an opponent's piece (invalid)
 
         # Bee placement rule: Must be placed by the 4th turn
         if self.turn_counter[player_index] >= 3 and not self.bee_placed[player_index]:
@@ -148,75 +163,137 @@ class HiveGame:
         """Make a move on the board."""
         origin, destination = move
 
-        player_index = 0 if player == "Player 1" else 1
+        zobrist = self.zobrist
 
         # Handle the case where the piece is not on the board initially
         if origin is not None:
-            cell_content = self.boardState.board[origin[0]][origin[1]]
-            if isinstance(cell_content, list):
-                if len(cell_content) == 1:
-                    piece = cell_content[0]
-                    self.boardState.board[origin[0]][origin[1]] = None
-                else:
-                    piece = cell_content.pop(-1)  # Remove the top piece from the stack
-            else:
-                piece = cell_content
-                self.boardState.board[origin[0]][origin[1]] = None  # Remove piece from origin
-            self.boardState.pieces_on_board[player_index].remove((origin[0], origin[1], piece[1]))
+            height = self.boardState.get_stack_height(origin[0], origin[1])
+            piece = self.boardState.pop_piece(origin[0], origin[1])  # Remove piece from origin
+            self.zobrist_key ^= zobrist.piece_keys[origin[0]][origin[1]][height - 1][piece]
+            self.update_step_mobility(origin, piece, self.boardState.get_top_piece(origin[0], origin[1]))
+            if height == 1:
+                self.update_bee_threat(origin, -1)  # The origin cell is now empty
 
         else:
             # If origin is None, the piece is being placed for the first time
             piece_type = destination[2]
             piece = (player, piece_type)
+            hand_keys = zobrist.hand_keys[player][piece_type]
+            count = self.player_pieces[player][piece_type]
+            self.zobrist_key ^= hand_keys[count] ^ hand_keys[count - 1]
             self.player_pieces[player][piece_type] -= 1  # Decrease the piece count
+            self.piece_count[0 if player == "Player 1" else 1] += 1
 
         # Place the piece at the destination
-        cell_content = self.boardState.board[destination[0]][destination[1]]
-        if isinstance(cell_content, list):
-            cell_content.append(piece)  # Add to the stack
-        elif cell_content is None:
-            self.boardState.board[destination[0]][destination[1]] = piece
-        else:
-            self.boardState.board[destination[0]][destination[1]] = [cell_content, piece]  # Convert to stack
-        self.boardState.pieces_on_board[player_index].append((destination[0], destination[1], piece[1]))
+        covered_piece = self.boardState.get_top_piece(destination[0], destination[1])
+        self.boardState.push_piece(destination[0], destination[1], piece)
+        self.update_step_mobility((destination[0], destination[1]), covered_piece, piece)
+        height = self.boardState.get_stack_height(destination[0], destination[1])
+        self.zobrist_key ^= zobrist.piece_keys[destination[0]][destination[1]][height - 1][piece]
+        self.zobrist_key ^= zobrist.side_key
+        if height == 1:
+            self.update_bee_threat((destination[0], destination[1]), 1)  # The destination cell was empty
+
+        # Track the Bee
+        if piece[1] == "Bee":
+            player_index = 0 if piece[0] == "Player 1" else 1
+            self.bee_placed[player_index] = True
+            self.bee_coordinates[player_index] = (destination[0], destination[1])
+            self.bee_threat[player_index] = self.boardState.count_occupied_neighbors(destination[0], destination[1])
 
 
     def undo_move(self, move, player):
         """Undo a move on the board."""
         origin, destination = move
-        player_index = 0 if player == "Player 1" else 1
+        zobrist = self.zobrist
+        self.zobrist_key ^= zobrist.side_key
 
         # Remove the piece from the destination
-        cell_content = self.boardState.board[destination[0]][destination[1]]
-        if isinstance(cell_content, list):
-            piece = cell_content.pop(-1)  # Remove the top piece
-            if len(cell_content) == 1:
-                self.boardState.board[destination[0]][destination[1]] = cell_content[0]  # Convert to single element
-            elif len(cell_content) == 0:
-                self.boardState.board[destination[0]][destination[1]] = None
-        else:
-            piece = cell_content
-            self.boardState.board[destination[0]][destination[1]] = None
-
-        # Update pieces_on_board
-        self.boardState.pieces_on_board[player_index].remove((destination[0], destination[1], piece[1]))
+        height = self.boardState.get_stack_height(destination[0], destination[1])
+        piece = self.boardState.pop_piece(destination[0], destination[1])
+        self.zobrist_key ^= zobrist.piece_keys[destination[0]][destination[1]][height - 1][piece]
+        self.update_step_mobility((destination[0], destination[1]), piece, self.boardState.get_top_piece(destination[0], destination[1]))
+        if height == 1:
+            self.update_bee_threat((destination[0], destination[1]), -1)  # The destination cell is empty again
+
+        # Put the Bee back where it was (or back in hand)
+        if piece[1] == "Bee":
+            player_index = 0 if piece[0] == "Player 1" else 1
+            if origin is None:
+                self.bee_placed[player_index] = False
+                self.bee_coordinates[player_index] = None
+                self.bee_threat[player_index] = 0
+            else:
+                self.bee_coordinates[player_index] = (origin[0], origin[1])
 
         # Handle the case where the piece was placed for the first time
         if origin is None:
             # Restore the piece count for the player
             player, piece_type = piece
+            hand_keys = zobrist.hand_keys[player][piece_type]
+            count = self.player_pieces[player][piece_type]
+            self.zobrist_key ^= hand_keys[count] ^ hand_keys[count + 1]
             self.player_pieces[player][piece_type] += 1
+            self.piece_count[0 if player == "Player 1" else 1] -= 1
         else:
             # Restore the piece to its origin
-            cell_content = self.boardState.board[origin[0]][origin[1]]
-            if isinstance(cell_content, list):
-                cell_content.append(piece)  # Add to the stack
-            elif cell_content is None:
-                self.boardState.board[origin[0]][origin[1]] = piece
-            else:
-                self.boardState.board[origin[0]][origin[1]] = [cell_content, piece]  # Convert to stack
+            covered_piece = self.boardState.get_top_piece(origin[0], origin[1])
+            self.boardState.push_piece(origin[0], origin[1], piece)
+            self.update_step_mobility(origin, covered_piece, piece)
+            height = self.boardState.get_stack_height(origin[0], origin[1])
+            self.zobrist_key ^= zobrist.piece_keys[origin[0]][origin[1]][height - 1][piece]
+            if height == 1:
+                self.update_bee_threat(origin, 1)  # The origin cell is occupied again
+            if piece[1] == "Bee":
+                player_index = 0 if piece[0] == "Player 1" else 1
+                self.bee_threat[player_index] = self.boardState.count_occupied_neighbors(origin[0], origin[1])
+
+
+    def update_bee_threat(self, cell, delta):
+        """Adjust the Bee threat counters after a cell became occupied (+1) or empty (-1)."""
+        for player_index in (0, 1):
+            if self.bee_placed[player_index] and cell in self.boardState.get_neighbors(*self.bee_coordinates[player_index]):
+                self.bee_threat[player_index] += delta
+
+
+    @staticmethod
+    def get_step_count(piece_type, occupied_neighbors, neighbors):
+        """
+        Pseudo-mobility of a top piece: the cells it could step to, ignoring the one hive rule
+        (occupied neighbors for a Grasshopper, every neighbor for a Beetle, empty neighbors otherwise).
+        """
+        if piece_type == "Grasshopper":
+            return occupied_neighbors
+        if piece_type == "Beetle":
+            return neighbors
+        return neighbors - occupied_neighbors
 
-            self.boardState.pieces_on_board[player_index].append((origin[0], origin[1], piece[1]))
+
+    def update_step_mobility(self, cell, previous_top, new_top):
+        """
+        Adjust the pseudo-mobility counters after the top piece of a cell changed: the old top piece's
+        steps are replaced by the new one's, and if the cell became occupied or empty, every neighboring
+        Grasshopper gains or loses a step while Bees, Ants and Spiders lose or gain one.
+        """
+        board_state = self.boardState
+        occupied = board_state.count_occupied_neighbors(*cell)
+        neighbors = len(board_state.get_neighbors(*cell))
+        if previous_top is not None:
+            self.step_mobility[0 if previous_top[0] == "Player 1" else 1] -= self.get_step_count(previous_top[1], occupied, neighbors)
+        if new_top is not None:
+            self.step_mobility[0 if new_top[0] == "Player 1" else 1] += self.get_step_count(new_top[1], occupied, neighbors)
+
+        delta = (new_top is not None) - (previous_top is not None)
+        if delta:
+            jumpers = board_state.count_neighbor_pieces(*cell, ("Grasshopper",))
+            crawlers = board_state.count_neighbor_pieces(*cell, ("Bee", "Ant", "Spider"))
+            for player_index in (0, 1):
+                self.step_mobility[player_index] += delta * (jumpers[player_index] - crawlers[player_index])
+
+
+    def pass_turn(self):
+        """Hand the turn to the other player without moving (keeps the side-to-move key in sync)."""
+        self.zobrist_key ^= self.zobrist.side_key
 
 
     def move_threatens_bee(self, move, opponent):
@@ -253,27 +330,18 @@ class HiveGame:
         Returns:
             True if the move is valid; False otherwise.
         """
-        cell_content = self.boardState.board[origin[0]][origin[1]]
-        top_piece = cell_content[-1] if isinstance(cell_content, list) else cell_content
-        
+        top_piece = self.boardState.get_top_piece(*origin)
+
         if top_piece[1] != "Beetle" and self.boardState.board[destination[0]][destination[1]] is not None:
             return False
 
         # Check sliding restriction for the origin (exclude the piece itself)
-        origin_neighbors = [
-            n for n in self.boardState.get_neighbors(*origin)
-            if self.boardState.is_cell_occupied(*n) and n != destination
-        ]
-        if len(origin_neighbors) >= 5:
+        if self.boardState.count_occupied_neighbors(*origin, exclude=destination) >= 5:
             return False
 
         # Check sliding restriction for the destination
         if top_piece[1] != "Grasshopper":
-            destination_neighbors = [
-                n for n in self.boardState.get_neighbors(*destination)
-                if self.boardState.is_cell_occupied(*n) and n != origin
-            ]
-            if len(destination_neighbors) >= 5:
+            if self.boardState.count_occupied_neighbors(*destination, exclude=origin) >= 5:
                 return False
 
         # Check hive integrity after the move
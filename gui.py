@@ -1,17 +1,29 @@
 import os
 import sys
 import math
+import multiprocessing
+import threading
 
 import tkinter as tk
 from tkinter import messagebox
 from tkinter import ttk
-from PIL import Image, ImageTk
+from PIL import Image
 
+from bitboard import BitboardBoardState
+from board_view import BoardView, SpriteCache
 from engine import HiveGame
-from hiveAI import HiveAI
+from hiveAI import HiveAI, DIFFICULTIES, MATE_PLIES
+from mcts import HiveMCTS
+from opening_book import open_opening_book
+from pondering import Ponderer
 
 basedir = getattr(sys, '_MEIPASS', os.path.dirname(__file__))
 assets_dir = os.path.join(basedir, "assets")
+# How often the window checks on the AI's worker thread, in milliseconds
+SEARCH_POLL_MS = 100
+# Hexagon radius of each zoom level, in pixels
+ZOOM_LEVELS = (20, 28, 36, 50, 64, 80)
+DEFAULT_ZOOM_LEVEL = 3
 
 class HiveGameGUI:
 
@@ -23,7 +35,8 @@ class HiveGameGUI:
 
         # Game settings
         self.board_size = 20
-        self.cell_size = 50
+        self.zoom_level = DEFAULT_ZOOM_LEVEL
+        self.cell_size = ZOOM_LEVELS[self.zoom_level]
         self.game_mode = None  # Game mode (PvP, PvC, CvC)
         self.selected_piece_to_move = None
         self.selected_piece_coord = (None, None)
@@ -31,6 +44,10 @@ class HiveGameGUI:
         self.first_play = True
         self.max_depth = []
         self.time_limit = []
+        self.search_mode = []
+        self.mobility_mode = []
+        self.mate_plies = []
+        self.ai_engine = []
         self.current_character = tk.StringVar(value="Bee")  # Default character
         self.colors = {
             "Player 1": "#3498db",
@@ -47,13 +64,35 @@ class HiveGameGUI:
             "Grasshopper": Image.open(os.path.join(assets_dir, "grasshopper.png")),
             "Beetle": Image.open(os.path.join(assets_dir, "beetle.png")),
         }
+        self.sprites = SpriteCache(self.original_images, len(ZOOM_LEVELS) * len(self.original_images))
         self.character_images = self.resize_images()
 
         # Backend trackers
-        self.backend = HiveGame(board_size=self.board_size)
-        self.board = self.backend.boardState.board
-        self.ai = HiveAI(self.backend)
+        self.backend = HiveGame(board_size=self.board_size, board_backend=BitboardBoardState)
+        self.ai = HiveAI(self.backend, opening_book=open_opening_book())
+        self.mcts = HiveMCTS(self.backend)
+        # Searches the AI's next move while the human thinks in PvC
+        self.ponderer = Ponderer(self.ai)
+        # The AI searches in a worker thread so the window stays responsive; Restart cancels it through the stop flag
+        self.search_thread = None
+        self.search_ai = None
+        self.search_result = None
+        self.search_cancelled = multiprocessing.RawValue('b', False)
+        self.ai.stop_flag = self.search_cancelled
+        self.mcts.stop_flag = self.search_cancelled
+        self.computer_move_job = None  # Pending root.after call of computer_move
+        self.bind_backend()
+
+        # Board widgets, built by the first setup_game and kept for later games
+        self.frame = None
+        self.view = None
 
+        # Show the game mode selection screen
+        self.show_game_mode_selection()
+
+    def bind_backend(self):
+        """Point the GUI's shortcuts at the state of the current game."""
+        self.board = self.backend.boardState.board
         self.current_player = self.backend.current_player
         self.turn_counter = self.backend.turn_counter
         self.bee_coordinates = self.backend.bee_coordinates
@@ -62,9 +101,6 @@ class HiveGameGUI:
         self.player_pieces = self.backend.player_pieces
         self.pieces_on_board = self.backend.boardState.pieces_on_board
 
-        # Show the game mode selection screen
-        self.show_game_mode_selection()
-
     def show_game_mode_selection(self):
         """Show a menu for selecting the game mode before starting the game."""
         self.menu_frame = tk.Frame(self.root, bg="#34495e", width=1200, height=700)
@@ -90,7 +126,7 @@ class HiveGameGUI:
 
     def show_difficulty_selection(self, game_mode):
         """Show a menu for selecting the AI difficulty before starting a PvP or PvC game."""
-        self.menu_frame.pack_forget()  # Hide the game mode selection menu
+        self.menu_frame.destroy()  # Remove the game mode selection menu
         self.menu_frame = tk.Frame(self.root, bg="#34495e", width=1200, height=700)
         self.menu_frame.pack(fill=tk.BOTH, expand=True)
 
@@ -115,21 +151,19 @@ class HiveGameGUI:
                                      fg="white", command=lambda: self.set_ai_difficulty(game_mode, "hard"))
         hard_mode_button.pack(pady=10, fill=tk.X)
 
-    def set_ai_difficulty(self, game_mode, game_difficulty):
-        max_depth = {
-            "easy": 1,
-            "medium": 2,
-            "hard": 50
-        }
-
-        time_limit = {
-            "easy": 2,
-            "medium": 5,
-            "hard": 12
-        }
+        mcts_mode_button = tk.Button(self.menu_frame, text="MCTS", font=("Segoe UI", 18), bg="#3498db",
+                                     fg="white", command=lambda: self.set_ai_difficulty(game_mode, "mcts"))
+        mcts_mode_button.pack(pady=10, fill=tk.X)
 
-        self.max_depth.append(max_depth[game_difficulty])
-        self.time_limit.append(time_limit[game_difficulty])
+    def set_ai_difficulty(self, game_mode, game_difficulty):
+        # Depth, time limit, search mode and engine of each difficulty
+        difficulty = DIFFICULTIES[game_difficulty]
+        self.max_depth.append(difficulty["max_depth"])
+        self.time_limit.append(difficulty["time_limit"])
+        self.search_mode.append(difficulty["search_mode"])
+        self.mobility_mode.append(difficulty.get("mobility_mode", "exact"))
+        self.mate_plies.append(difficulty.get("mate_plies", MATE_PLIES))
+        self.ai_engine.append(difficulty["engine"])
 
         if game_mode == "CvC" and len(self.max_depth) == 1:
             self.show_difficulty_selection(game_mode)
@@ -144,34 +178,40 @@ class HiveGameGUI:
     def start_pvp_game(self):
         """Start the PvP game."""
         self.game_mode = "PvP"
-        self.menu_frame.pack_forget()  # Hide the game mode selection menu
+        self.menu_frame.destroy()  # Remove the game mode selection menu
         self.setup_game()
 
     def start_pvc_game(self):
         """Start the PvC game."""
         self.game_mode = "PvC"
-        self.menu_frame.pack_forget()  # Hide the game mode selection menu
+        self.menu_frame.destroy()  # Remove the game mode selection menu
         self.setup_game()
 
     def start_cvc_game(self):
         """Start the CvC game."""
         self.game_mode = "CvC"
-        self.menu_frame.pack_forget()  # Hide the game mode selection menu
+        self.menu_frame.destroy()  # Remove the game mode selection menu
         self.setup_game()
-        self.root.after(1000, self.computer_move)
+        self.computer_move_job = self.root.after(1000, self.computer_move)
 
     def setup_game(self):
         """Setup the board and start the game logic."""
+        if self.frame is not None:
+            # The board was built for an earlier game and reset by reset_game, show it again
+            self.frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+            self.info_frame.pack(fill=tk.X, padx=20, pady=(10, 0))
+            self.canvas.bind("<Button-1>", self.on_click)
+            self.info_label.config(text=f"{self.current_player}'s Turn")
+            self.piece_count_label.config(text=self.get_piece_count_text())
+            return
+
         self.frame = tk.Frame(self.root, bg="#ffffff")
         self.frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
 
-        self.canvas = tk.Canvas(self.frame, bg="#ffffff", scrollregion=(0, 0,
-                                                                        self.board_size * self.cell_size * 1.5,
-                                                                        self.board_size * self.cell_size * math.sqrt(
-                                                                            3)))
+        self.canvas = tk.Canvas(self.frame, bg="#ffffff", scrollregion=self.get_scroll_region())
         self.h_scrollbar = tk.Scrollbar(self.frame, orient=tk.HORIZONTAL, command=self.canvas.xview)
         self.v_scrollbar = tk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self.canvas.yview)
-        self.canvas.configure(xscrollcommand=self.h_scrollbar.set, yscrollcommand=self.v_scrollbar.set)
+        self.canvas.configure(xscrollcommand=self.on_scroll(self.h_scrollbar), yscrollcommand=self.on_scroll(self.v_scrollbar))
 
         self.h_scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
         self.v_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
@@ -196,6 +236,10 @@ class HiveGameGUI:
         self.canvas.yview_moveto(y_center)
         # Bind click event
         self.canvas.bind("<Button-1>", self.on_click)
+        # Zoom with Ctrl + mouse wheel (Button-4/5 on Linux)
+        self.canvas.bind("<Control-MouseWheel>", lambda event: self.zoom(1 if event.delta > 0 else -1, event))
+        self.canvas.bind("<Control-Button-4>", lambda event: self.zoom(1, event))
+        self.canvas.bind("<Control-Button-5>", lambda event: self.zoom(-1, event))
 
         # Info panel
         self.info_frame = tk.Frame(self.root, bg="#2c3e50", height=100)
@@ -218,68 +262,102 @@ class HiveGameGUI:
                                           bg="#2c3e50", fg="white")
         self.piece_count_label.pack(side=tk.LEFT, expand=True, anchor="center")
 
+        # Zoom buttons
+        tk.Button(self.info_frame, text="+", font=("Segoe UI", 14), bg="#3498db", fg="white", width=2,
+                  command=lambda: self.zoom(1)).pack(side=tk.RIGHT, padx=2)
+        tk.Button(self.info_frame, text="−", font=("Segoe UI", 14), bg="#3498db", fg="white", width=2,
+                  command=lambda: self.zoom(-1)).pack(side=tk.RIGHT, padx=2)
+
         # Show Reset Button
         reset_button = tk.Button(self.info_frame, text="Restart", font=("Segoe UI", 16), bg="#e74c3c",
                                  fg="white", command=self.reset_game)
         reset_button.pack(side=tk.RIGHT, padx=10)
 
-    def reset_game(self):
-        """Re-instantiate the class to start the game from the beginning."""
-        # Destroy the current instance
-        self.root.destroy()  # Close the current Tkinter root window
+    def on_scroll(self, scrollbar):
+        """Get a scroll callback that moves the scrollbar and draws the cells scrolled into view."""
+        def scroll(*args):
+            scrollbar.set(*args)
+            self.view.schedule_refresh()
+        return scroll
 
-        # Create a new root window and re-instantiate the HiveGameGUI class
-        new_root = tk.Tk()
-        new_root.iconbitmap(os.path.join(assets_dir, "hive_icon.ico"))
-        new_game = HiveGameGUI(new_root)
-        new_root.mainloop()
+    def reset_game(self):
+        """Start again from the game mode selection, reusing the window, the loaded images and the drawn grid."""
+        # Stop the AI's search and pondering; its worker processes are kept for the next game
+        if self.computer_move_job is not None:
+            self.root.after_cancel(self.computer_move_job)
+            self.computer_move_job = None
+        self.cancel_search()
+        self.ponderer.stop()
+
+        # Reset the game in place, so the AI engines keep their reference to it
+        self.backend.reset()
+        self.bind_backend()
+        self.ai.new_game()
+        self.mcts.root = None
+        self.game_mode = None
+        self.selected_piece_to_move = None
+        self.selected_piece_coord = (None, None)
+        self.selected_piece_valid_moves = None
+        self.first_play = True
+        self.max_depth = []
+        self.time_limit = []
+        self.search_mode = []
+        self.mobility_mode = []
+        self.mate_plies = []
+        self.ai_engine = []
+        self.current_character.set("Bee")
+
+        # Only the pieces and highlights are cleared, then the board waits behind the menu
+        self.view.reset()
+        self.frame.pack_forget()
+        self.info_frame.pack_forget()
+        self.show_game_mode_selection()
 
     def resize_images(self):
-        """Resize images to fit inside the hexagon."""
-        resized_images = {}
-        target_size = int(self.cell_size)
-        for name, img in self.original_images.items():
-            img_resized = img.resize((target_size, target_size))
-            resized_images[name] = ImageTk.PhotoImage(img_resized)
-        return resized_images
+        """Resize images to fit inside the hexagon (cached per zoom level)."""
+        return self.sprites.get_all(int(self.cell_size))
+
+    def get_scroll_region(self):
+        """Get the canvas scroll region of the board at the current zoom level."""
+        return 0, 0, self.board_size * self.cell_size * 1.5, self.board_size * self.cell_size * math.sqrt(3)
+
+    def zoom(self, step, event=None):
+        """Zoom in (step > 0) or out, keeping the board point under the mouse (or the view center) in place."""
+        zoom_level = min(max(self.zoom_level + step, 0), len(ZOOM_LEVELS) - 1)
+        if zoom_level == self.zoom_level:
+            return
+        if event is not None:
+            anchor_x, anchor_y = event.x, event.y
+        else:
+            anchor_x, anchor_y = self.canvas.winfo_width() / 2, self.canvas.winfo_height() / 2
+        scale = ZOOM_LEVELS[zoom_level] / self.cell_size
+        board_x = self.canvas.canvasx(anchor_x) * scale
+        board_y = self.canvas.canvasy(anchor_y) * scale
+
+        self.zoom_level = zoom_level
+        self.cell_size = ZOOM_LEVELS[zoom_level]
+        self.character_images = self.resize_images()
+        scroll_region = self.get_scroll_region()
+        self.canvas.configure(scrollregion=scroll_region)
+        self.canvas.xview_moveto(max(board_x - anchor_x, 0) / scroll_region[2])
+        self.canvas.yview_moveto(max(board_y - anchor_y, 0) / scroll_region[3])
+        self.view.set_cell_size(self.cell_size, self.character_images)
 
     def draw_grid(self):
-        """Draw hexagonal cells on the grid."""
-        for row in range(self.board_size):
-            for col in range(self.board_size):
-                x_offset = col * self.cell_size * 1.5
-                y_offset = row * self.cell_size * math.sqrt(3)
-                if col % 2 == 1:
-                    y_offset += self.cell_size * math.sqrt(3) / 2
-
-                points = self.hexagon_points(x_offset, y_offset, self.cell_size)
-                self.canvas.create_polygon(points, outline="#7f8c8d", fill="#ffffff", width=2, tags=f"cell-{row}-{col}")
-
-                # Draw row and column text (for debugging purposes, you can disable it later)
-                text_x = x_offset
-                # Adjust the text position slightly above the center
-                text_y = y_offset - self.cell_size * 0.5 - 12
-                self.canvas.create_text(text_x, text_y, text=f"{row},{col}", fill="black", font=("Segoe UI", 8))
-
-    def hexagon_points(self, x, y, size):
-        """Calculate the six corners of a hexagon centered at (x, y)."""
-        points = []
-        for i in range(6):
-            angle = math.radians(60 * i)
-            points.append(x + size * math.cos(angle))
-            points.append(y + size * math.sin(angle))
-        return points
+        """Draw the hexagonal cells inside the viewport; the view draws the others as they are scrolled to."""
+        self.view = BoardView(self.canvas, self.board_size, self.cell_size, self.character_images)
+        self.view.refresh()
 
     def on_click(self, event):
         """Handle click events to place a piece."""
+        if self.search_thread is not None:
+            return  # The computer is moving
         x, y = self.canvas.canvasx(event.x), self.canvas.canvasy(event.y)
-        item = self.canvas.find_closest(x, y)[0]
-        tags = self.canvas.gettags(item)
-
-        if not tags or not (tags[0].startswith("cell") or tags[0].startswith("image")):
+        cell = self.view.pixel_to_cell(x, y)
+        if cell is None:
             return
 
-        row, col = map(int, tags[0].split("-")[1:])
+        row, col = cell
 
         if self.board[row][col] is None:
             if self.selected_piece_to_move is not None:
@@ -288,8 +366,7 @@ class HiveGameGUI:
                 if not was_moved:
                     return
                 if self.board[self.selected_piece_coord[0]][self.selected_piece_coord[1]] is None:
-                    hexagon_tag = f"cell-{self.selected_piece_coord[0]}-{self.selected_piece_coord[1]}"
-                    self.canvas.itemconfig(hexagon_tag, outline=self.colors["None"], width=1)
+                    self.view.set_outline(self.selected_piece_coord[0], self.selected_piece_coord[1], self.colors["None"], 1)
                 self.selected_piece_to_move = None
                 self.selected_piece_coord = None
 
@@ -299,8 +376,7 @@ class HiveGameGUI:
                 self.place_piece(row, col)
         else:
             if self.selected_piece_to_move is not None and self.selected_piece_coord == (row, col):
-                hexagon_tag = f"cell-{row}-{col}"
-                self.canvas.itemconfig(hexagon_tag, outline=self.colors[self.current_player], width=5)
+                self.view.set_outline(row, col, self.colors[self.current_player], 5)
                 self.clear_selected_moves(row, col)
                 self.selected_piece_coord = None
                 self.selected_piece_to_move = None
@@ -310,8 +386,7 @@ class HiveGameGUI:
                 was_moved = self.move_piece(row, col)
                 # if not was_moved:
                 #     return
-                hexagon_tag = f"cell-{self.selected_piece_coord[0]}-{self.selected_piece_coord[1]}"
-                self.canvas.itemconfig(hexagon_tag, outline=self.colors["None"], width=1)
+                self.view.set_outline(self.selected_piece_coord[0], self.selected_piece_coord[1], self.colors["None"], 1)
                 self.selected_piece_to_move = None
                 self.selected_piece_coord = None
 
@@ -330,8 +405,7 @@ class HiveGameGUI:
                     # Default on select
                     if self.selected_piece_to_move is not None:
                         selected_row, selected_col = self.selected_piece_coord
-                        hexagon_tag = f"cell-{selected_row}-{selected_col}"
-                        self.canvas.itemconfig(hexagon_tag, outline=self.colors[self.current_player], width=5)
+                        self.view.set_outline(selected_row, selected_col, self.colors[self.current_player], 5)
                         self.clear_selected_moves(row, col)
 
                     self.selected_piece_to_move = self.board[row][col]
@@ -340,27 +414,22 @@ class HiveGameGUI:
 
                 self.selected_piece_coord = (row, col)
                 self.selected_piece_valid_moves = self.backend.get_piece_moves(row, col)
-                hexagon_tag = f"cell-{row}-{col}"
-                self.canvas.itemconfig(hexagon_tag, outline=self.colors["selection"], width=5)
+                self.view.set_outline(row, col, self.colors["selection"], 5)
 
                 for [row, col] in self.selected_piece_valid_moves:
-                    hexagon_tag = f"cell-{row}-{col}"
-                    self.canvas.itemconfig(hexagon_tag, outline=self.colors["moves"], width=5)
+                    self.view.set_outline(row, col, self.colors["moves"], 5)
 
                 # Update the hexagon outline color and thickness
 
     def clear_selected_moves(self, row, col):
         for [row, col] in self.selected_piece_valid_moves:
             if not self.backend.boardState.is_cell_occupied(row, col):
-                hexagon_tag = f"cell-{row}-{col}"
-                self.canvas.itemconfig(
-                    hexagon_tag, outline=self.colors["None"], width=1)
+                self.view.set_outline(row, col, self.colors["None"], 1)
             else:
                 cell_content = self.board[row][col]
                 top_piece = cell_content[-1] if isinstance(cell_content, list) else cell_content
 
-                hexagon_tag = f"cell-{row}-{col}"
-                self.canvas.itemconfig(hexagon_tag, outline=self.colors[top_piece[0]], width=5)
+                self.view.set_outline(row, col, self.colors[top_piece[0]], 5)
 
         self.selected_piece_valid_moves = None
 
@@ -408,14 +477,6 @@ class HiveGameGUI:
             messagebox.showwarning("Invalid Placement", "This move is not valid.")
             return
 
-        if (character == "Bee"):
-            if (self.current_player == "Player 1"):
-                self.bee_placed[0] = True
-                self.bee_coordinates[0] = (row, col)
-            else:
-                self.bee_placed[1] = True
-                self.bee_coordinates[1] = (row, col)
-
         if (character != "Bee" and self.turn_counter[0] == 3 and self.bee_placed[
             0] is False and self.current_player == "Player 1"):
             messagebox.showwarning("Bee is not placed yet",
@@ -428,16 +489,10 @@ class HiveGameGUI:
             return
 
         # Update GUI to reflect the move
-        x_offset = col * self.cell_size * 1.5
-        y_offset = row * self.cell_size * math.sqrt(3)
-        if col % 2 == 1:
-            y_offset += self.cell_size * math.sqrt(3) / 2
-        image = self.character_images[character]
-        self.canvas.create_image(x_offset, y_offset, image=image, tags=f"image-{row}-{col}")
+        self.view.set_piece(row, col, character)
 
         # Update the hexagon outline color and thickness
-        hexagon_tag = f"cell-{row}-{col}"
-        self.canvas.itemconfig(hexagon_tag, outline=self.colors[self.current_player], width=5)
+        self.view.set_outline(row, col, self.colors[self.current_player], 5)
 
         # After successfully placing the piece
         player_index = 0 if self.current_player == "Player 1" else 1
@@ -471,9 +526,7 @@ class HiveGameGUI:
             if self.bee_placed[0] is False:
                 messagebox.showwarning(
                     "Invalid Move", "You Can't Move pieces before placing your Bee")
-                hexagon_tag = f"cell-{self.selected_piece_coord[0]}-{self.selected_piece_coord[1]}"
-                self.canvas.itemconfig(
-                    hexagon_tag, outline=self.colors["Player 1"], width=5)
+                self.view.set_outline(self.selected_piece_coord[0], self.selected_piece_coord[1], self.colors["Player 1"], 5)
                 self.selected_piece_to_move = None
                 self.selected_piece_coord = None
                 return
@@ -481,9 +534,7 @@ class HiveGameGUI:
             if self.bee_placed[1] is False:
                 messagebox.showwarning(
                     "Invalid Move", "You Can't Move pieces before placing your Bee")
-                hexagon_tag = f"cell-{self.selected_piece_coord[0]}-{self.selected_piece_coord[1]}"
-                self.canvas.itemconfig(
-                    hexagon_tag, outline=self.colors["Player 2"], width=5)
+                self.view.set_outline(self.selected_piece_coord[0], self.selected_piece_coord[1], self.colors["Player 2"], 5)
                 self.selected_piece_to_move = None
                 self.selected_piece_coord = None
                 return
@@ -495,44 +546,22 @@ class HiveGameGUI:
         # # Update backend with the move
         # self.board[row][col] = self.selected_piece_to_move
 
-        if character == "Bee":
-            self.bee_coordinates[player_index] = (row, col)
-
-        # Handle stacking logic if the target cell is not empty
-        if self.board[row][col] is not None:
-            if character != "Beetle":
-                messagebox.showwarning("Invalid Move", "Only Beetles can move onto occupied cells.")
-                return  # Non-Beetle pieces cannot move onto occupied cells
-            else:
-                # Add the Beetle to the top of the stack
-                if isinstance(self.board[row][col], list):
-
-                    self.board[row][col].append(self.selected_piece_to_move)
-                else:
-                    self.board[row][col] = [self.board[row][col], self.selected_piece_to_move]
-                # After successfully placing the piece
-                self.pieces_on_board[player_index].append((row, col, character))
-
-        else:
-            # Move the piece to an empty cell
-            self.board[row][col] = [self.selected_piece_to_move]
-            self.pieces_on_board[player_index].append((row, col, character))
+        # Only Beetles can climb on top of the hive
+        if self.board[row][col] is not None and character != "Beetle":
+            messagebox.showwarning("Invalid Move", "Only Beetles can move onto occupied cells.")
+            return  # Non-Beetle pieces cannot move onto occupied cells
 
+        # Move the piece in the backend (handles stacking)
+        self.backend.make_move((self.selected_piece_coord, (row, col)), self.current_player)
 
         # Remove the piece image from the original position
         self.remove_piece(self.selected_piece_coord[0], self.selected_piece_coord[1])
 
-        # Calculate new position offsets
-        x_offset = col * self.cell_size * 1.5
-        y_offset = row * self.cell_size * math.sqrt(3)
-        if col % 2 == 1:
-            y_offset += self.cell_size * math.sqrt(3) / 2
-        image = self.character_images[character]
-        self.canvas.create_image(x_offset, y_offset, image=image, tags=f"image-{row}-{col}")
+        # Show the piece on top of the new position
+        self.view.set_piece(row, col, character)
 
         # Update the hexagon outline color and thickness for the new position
-        hexagon_tag = f"cell-{row}-{col}"
-        self.canvas.itemconfig(hexagon_tag, outline=self.colors[self.current_player], width=5)
+        self.view.set_outline(row, col, self.colors[self.current_player], 5)
 
         # Check for game-over conditions
         if self.backend.check_bee_surrounded("Player 1"):
@@ -569,12 +598,12 @@ class HiveGameGUI:
 
         # If it's the computer's turn, let the AI make a move
         if self.game_mode == "CvC" or (self.game_mode == "PvC" and self.current_player == "Player 2"):
-            self.root.after(250, self.computer_move)  # Add a slight delay for better visualization
+            self.computer_move_job = self.root.after(250, self.computer_move)  # Add a slight delay for better visualization
 
     def computer_move(self):
-        """Handle the computer's turn."""
+        """Start the computer's turn: the AI searches in a worker thread, polled by poll_computer_move."""
+        self.computer_move_job = None
         self.info_label.config(text=f"PC is thinking...")
-        self.root.update_idletasks()  # Update the GUI to show the status
 
         if self.game_mode == "CvC":
             player_index = 0 if self.current_player == "Player 1" else 1
@@ -582,15 +611,60 @@ class HiveGameGUI:
             player_index = 0
 
         # Get the best move from the AI
-        best_move = self.ai.iterative_deepening(
-            is_maximizing_player=(self.current_player == "Player 1"),
-            max_depth=self.max_depth[player_index],  # Adjust depth as needed
-            time_limit=self.time_limit[player_index]  # Allow time in seconds for the AI to calculate
-        )
-
+        self.ai.search_mode = self.search_mode[player_index]
+        self.ai.mobility_mode = self.mobility_mode[player_index]
+        self.ai.mate_plies = self.mate_plies[player_index]
+        if self.ai_engine[player_index] == "mcts":
+            ai = self.mcts
+        elif self.game_mode == "PvC":
+            ai = self.ponderer  # Reuses the pondered search if the human played the predicted move
+        else:
+            ai = self.ai
+        is_maximizing_player = self.current_player == "Player 1"
+        max_depth = self.max_depth[player_index]  # Adjust depth as needed
+        time_limit = self.time_limit[player_index]  # Allow time in seconds for the AI to calculate
+
+        def search():
+            self.search_result = ai.iterative_deepening(is_maximizing_player, max_depth, time_limit)
+
+        self.search_ai = ai
+        self.search_result = None
+        self.search_thread = threading.Thread(target=search, name="search", daemon=True)
+        self.search_thread.start()
+        self.root.after(SEARCH_POLL_MS, self.poll_computer_move)
+
+    def poll_computer_move(self):
+        """Show the progress of the AI's search until its thread is done, then play the move."""
+        if self.search_thread is None:
+            return  # The search was cancelled
+        if self.search_thread.is_alive():
+            depth, best_move, nodes_per_second = self.search_ai.get_progress()
+            if depth is None:
+                progress = f"{nodes_per_second} playouts/s"
+            else:
+                progress = f"depth {depth} | {nodes_per_second} nodes/s"
+            if best_move is not None:
+                progress += f" | best {best_move}"
+            self.info_label.config(text=f"PC is thinking... {progress}")
+            self.root.after(SEARCH_POLL_MS, self.poll_computer_move)
+            return
+        self.search_thread = None
+        self.play_computer_move(self.search_result)
+
+    def cancel_search(self):
+        """Stop the AI's search, if one is running, and wait for its thread."""
+        if self.search_thread is not None:
+            self.search_cancelled.value = True
+            self.search_thread.join()
+            self.search_thread = None
+            self.search_cancelled.value = False
+
+    def play_computer_move(self, best_move):
+        """Play the move found by the AI."""
         if not best_move:
             messagebox.showinfo(
                 "Pass", f"{self.current_player} Skipped his turn.")
+            self.backend.pass_turn()
             self.switch_player()
             return
 
@@ -605,23 +679,13 @@ class HiveGameGUI:
             source_row, source_col = origin
             target_row, target_col = destination
 
-            # Retrieve the board cell and handle list or single element cases
-            cell_content = self.board[source_row][source_col]
-
-            if isinstance(cell_content, list):
-                if len(cell_content) == 1:
-                    self.board[source_row][source_col] = cell_content[0]  # Convert to single element
-                    self.selected_piece_to_move = cell_content[0]
-                else:
-                    self.selected_piece_to_move = cell_content[-1]  # Take the last element
-            else:
-                self.selected_piece_to_move = cell_content
+            # Select the topmost piece of the source cell
+            self.selected_piece_to_move = self.backend.boardState.get_top_piece(source_row, source_col)
 
             self.selected_piece_coord = (source_row, source_col)
             was_moved = self.move_piece(target_row, target_col, computer_mode=True)
             if was_moved:
-                hexagon_tag = f"cell-{self.selected_piece_coord[0]}-{self.selected_piece_coord[1]}"
-                self.canvas.itemconfig(hexagon_tag, outline=self.colors["None"], width=1)
+                self.view.set_outline(self.selected_piece_coord[0], self.selected_piece_coord[1], self.colors["None"], 1)
                 self.selected_piece_to_move = None
                 self.selected_piece_coord = None
         # Check if the game is over
@@ -629,78 +693,38 @@ class HiveGameGUI:
             self.end_game("Player 2 wins!")
         elif self.backend.check_bee_surrounded("Player 2"):
             self.end_game("Player 1 wins!")
+        elif self.game_mode == "PvC" and self.search_ai is self.ponderer:
+            # Think about the next move while the human plays
+            self.ponderer.start(self.backend, self.current_player, self.max_depth[0], self.time_limit[0])
 
     def end_game(self, message):
         """End the game and display the result."""
+        self.ponderer.stop()
         messagebox.showinfo("Game Over", message + "\nRestart The Game To Continue")
-        self.canvas.delete("all")
+        self.view.clear()
         self.canvas.unbind("<Button-1>")
 
     def remove_piece(self, row, col):
-        """Remove the piece from the specified hexagon."""
-        # Check if there is a piece to remove
-        if self.board[row][col] is None:
-            return  # No piece to remove
-
-        x_offset = col * self.cell_size * 1.5
-        y_offset = row * self.cell_size * math.sqrt(3)
-        if col % 2 == 1:
-            y_offset += self.cell_size * math.sqrt(3) / 2
-
-        player_index = 0 if self.current_player == "Player 1" else 1
-
-        # Find and remove any image associated with this cell
-        image_items = self.canvas.find_withtag(f"image-{row}-{col}")
-        for image_item in image_items:
-            self.canvas.delete(image_item)
-
-        # Update the board to None (removes the player's piece)
-        if isinstance(self.board[row][col], list):
-
-            if len(self.board[row][col]) == 1:
-                self.pieces_on_board[player_index].remove((row, col, self.board[row][col][0][1]))
-
-                self.board[row][col] = None
-            else:
-                removed_piece = self.board[row][col].pop(-1)
-                self.pieces_on_board[player_index].remove((row, col, removed_piece[1]))
-
-                if len(self.board[row][col]) == 1:
-                    self.board[row][col] = self.board[row][col][0]
-                    character = self.board[row][col][1]
-                    image = self.character_images[character]
-
-                    # Update the hexagon outline color and thickness
-                    hexagon_tag = f"cell-{row}-{col}"
-                    self.canvas.itemconfig(hexagon_tag, outline=self.colors[self.board[row][col][0]], width=5)
-                else:
-                    character = self.board[row][col][-1][1]
-                    image = self.character_images[character]
-
-                    # Update the hexagon outline color and thickness
-                    hexagon_tag = f"cell-{row}-{col}"
-                    self.canvas.itemconfig(hexagon_tag, outline=self.colors[self.board[row][col][-1][0]], width=5)
-
-                # Draw the piece image
-                self.canvas.create_image(x_offset, y_offset, image=image, tags=f"image-{row}-{col}")
-        else:
-            self.pieces_on_board[player_index].remove((row, col, self.board[row][col][1]))
-            self.board[row][col] = None
-
-            # Remove the image of the piece from the canvas
-            hexagon_tag = f"cell-{row}-{col}"
-
-            # Find and remove any image associated with this cell
-            image_items = self.canvas.find_withtag(f"image-{row}-{col}")
-            for image_item in image_items:
-                self.canvas.delete(image_item)
-
-            # Optionally reset the hexagon outline to its default state
-            self.canvas.itemconfig(hexagon_tag, outline="#7f8c8d", width=2)
-
+        """Remove the moved piece's image from the specified hexagon and show the piece underneath, if any."""
+        top_piece = self.backend.boardState.get_top_piece(row, col)
+        if top_piece is None:
+            # Reset the hexagon to its default state
+            self.view.set_piece(row, col, None)
+            self.view.set_outline(row, col, "#7f8c8d", 2)
+            return
 
-# Create the main window
-root = tk.Tk()
-root.iconbitmap(os.path.join(assets_dir, "hive_icon.ico"))
-game = HiveGameGUI(root)
-root.mainloop()
+        # Draw the piece that was underneath and update the hexagon outline color and thickness
+        self.view.set_piece(row, col, top_piece[1])
+        self.view.set_outline(row, col, self.colors[top_piece[0]], 5)
+
+
+# Create the main window (guarded so the AI's worker processes can import this module)
+if __name__ == "__main__":
+    root = tk.Tk()
+    root.iconbitmap(os.path.join(assets_dir, "hive_icon.ico"))
+    game = HiveGameGUI(root)
+    root.mainloop()
+    # Stop the AI's search, pondering and worker processes once the window is closed
+    game.cancel_search()
+    game.ponderer.stop()
+    game.ai.close()
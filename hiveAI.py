@@ -1,11 +1,123 @@
+import multiprocessing
+import os
+import pickle
+import random
 import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
 
 from engine import HiveGame
+from mate_solver import MateSolver
+from move_ordering import MoveOrderer
+from symmetry import canonicalize
+from transposition import TranspositionTable, SharedTranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+
+# Weight constants for evaluation criteria
+SURROUNDED_WEIGHT = 10000
+THREAT_WEIGHT = 800
+MOBILITY_WEIGHT = 5
+PIECE_COUNT_WEIGHT = 3
+# How many nodes are searched between two looks at the clock
+NODE_CHECK_INTERVAL = 32
+# Principal Variation Search: half-width of the aspiration window around the previous depth's score
+ASPIRATION_WINDOW = 200
+# Late move reductions: quiet moves after the first LMR_FULL_DEPTH_MOVES are searched one ply
+# shallower at nodes with at least LMR_MIN_DEPTH plies left
+LMR_FULL_DEPTH_MOVES = 3
+LMR_MIN_DEPTH = 3
+# Root moves leading to symmetric positions are searched once while fewer pieces than this are on the board
+ROOT_SYMMETRY_MAX_PIECES = 6
+# How often (in seconds) the main process checks its stop flag while it waits for root-parallel workers
+WORKER_POLL_INTERVAL = 0.05
+# Forced Bee surrounds within this many plies are solved before searching, unless a difficulty sets its own
+MATE_PLIES = 5
+# Share of the time limit the mate solver may use before the main search starts
+MATE_TIME_FRACTION = 0.2
+
+# Settings of the difficulty levels, used by the GUI and the self-play runner (selfplay.py).
+# "engine" is "minimax" (this alpha-beta search) or "mcts" (mcts.HiveMCTS, which ignores max_depth);
+# the other keys besides max_depth and time_limit are HiveAI arguments.
+DIFFICULTIES = {
+    # Easy only looks one ply ahead, so it skips the mate solver
+    "easy": {"engine": "minimax", "max_depth": 1, "time_limit": 2, "search_mode": "serial", "mate_plies": 0},
+    # Medium uses Principal Variation Search, Hard searches with every core and trades the exact
+    # mobility term for the cheap estimate to reach deeper
+    "medium": {"engine": "minimax", "max_depth": 2, "time_limit": 5, "search_mode": "pvs"},
+    "hard": {"engine": "minimax", "max_depth": 50, "time_limit": 12, "search_mode": "lazy_smp", "mobility_mode": "pseudo"},
+    "mcts": {"engine": "mcts", "max_depth": 1, "time_limit": 5, "search_mode": "serial"},
+}
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the deadline has passed."""
+
 
 class HiveAI:
 
-    def __init__(self, engine: HiveGame):
+    def __init__(self, engine: HiveGame, tt_size_mb=16, mobility_mode="exact", search_mode="serial", workers=None,
+                 opening_book=None, mate_plies=MATE_PLIES):
         self.engine = engine
+        # "exact" counts every legal move at each leaf, "pseudo" uses a cheap estimate.
+        # It may be changed between searches.
+        self.mobility_mode = mobility_mode
+        # "serial" searches the root moves one after another, "pvs" does so with Principal Variation Search,
+        # "root_parallel" spreads them over worker processes and
+        # "lazy_smp" runs helper processes on the same root that share the transposition table.
+        # It may be changed between searches.
+        self.search_mode = search_mode
+        self.workers = workers or os.cpu_count() or 1
+        self.tt_size_mb = tt_size_mb
+        # Survives between the depths of iterative deepening and between moves
+        if search_mode == "lazy_smp":
+            self.transposition_table = SharedTranspositionTable(tt_size_mb)
+        else:
+            self.transposition_table = TranspositionTable(tt_size_mb)
+        self.move_orderer = MoveOrderer(engine)
+        # OpeningBook consulted before searching, or None
+        self.opening_book = opening_book
+        # Forced Bee surrounds within this many plies are solved before searching (0 turns the solver off)
+        self.mate_plies = mate_plies
+        # Seconds the mate solver may use, None for MATE_TIME_FRACTION of the time limit
+        self.mate_time_limit = None
+        self.mate_solver = MateSolver(self)
+        self.losing_moves = set()  # Root moves the mate solver proved to lose, left out of the search
+        # Search controller: the running search unwinds once time.time() passes the deadline
+        # or once stop_flag.value is set by another process
+        self.deadline = None
+        self.stop_flag = None
+        self.nodes = 0
+        self.best_score = None  # Score of the last find_best_move, used to center the aspiration window
+        self.completed_depth = 0  # Deepest depth fully searched by the last iterative_deepening
+        self.best_move = None  # Best move of the deepest completed depth, readable while searching (see get_progress)
+        self.search_start_time = None
+        self.search_count = 0  # Lets the worker processes tell a new search from the next depth of the same one
+        # Lazy SMP helpers shuffle their root moves with this so they do not all search the same subtree first
+        self.root_order_rng = None
+        # Root-parallel workers: the best root score found by any worker, read again at every child of the root move
+        self.root_bound = None
+        # Worker processes and the state they share, started on the first parallel search
+        self._pool = None
+        self._pool_mode = None
+        self._root_bound = None
+        self._stop_flag = None
+
+
+    def new_game(self):
+        """Forget the transposition table and move ordering of the last game; the worker processes are kept."""
+        self.transposition_table.clear()
+        self.move_orderer = MoveOrderer(self.engine)
+        self.best_score = None
+        self.best_move = None
+        self.completed_depth = 0
+        self.search_start_time = None
+
+
+    def check_deadline(self):
+        """Count a node and abort the search if the deadline has passed or it was stopped (polled every NODE_CHECK_INTERVAL nodes)."""
+        self.nodes += 1
+        if self.nodes % NODE_CHECK_INTERVAL != 0:
+            return
+        if (self.deadline is not None and time.time() >= self.deadline) or (self.stop_flag is not None and self.stop_flag.value):
+            raise SearchTimeout()
 
 
     def minimax(self, depth, is_maximizing_player):
@@ -17,87 +129,271 @@ class HiveAI:
         Returns:
             The evaluation score of the best move for the current player.
         """
+        self.check_deadline()
         if depth == 0 or self.engine.is_game_over():
             return self.evaluate_board()
 
+        player = "Player 1" if is_maximizing_player else "Player 2"
         player_index = 0 if is_maximizing_player else 1
         self.engine.turn_counter[player_index] += 1  # Increment turn counter
 
-        if is_maximizing_player:
-            max_eval = float('-inf')
-            for move in self.get_all_moves("Player 1"):
-                self.engine.make_move(
-                    move, "Player 1" if is_maximizing_player else "Player 2")
-                eval = self.minimax(depth - 1, False)
-                self.engine.undo_move(
-                    move, "Player 1" if is_maximizing_player else "Player 2")
-                max_eval = max(max_eval, eval)
-            self.engine.turn_counter[player_index] -= 1  # Decrement turn counter
-            return max_eval
-        else:
-            min_eval = float('inf')
-            for move in self.get_all_moves("Player 2"):
-                self.engine.make_move(
-                    move, "Player 1" if is_maximizing_player else "Player 2")
-                eval = self.minimax(depth - 1, True)
-                self.engine.undo_move(
-                    move, "Player 1" if is_maximizing_player else "Player 2")
-                min_eval = min(min_eval, eval)
+        # try/finally keeps the board consistent when a SearchTimeout unwinds the search
+        try:
+            if is_maximizing_player:
+                max_eval = float('-inf')
+                for move in self.get_all_moves(player):
+                    self.engine.make_move(move, player)
+                    try:
+                        eval = self.minimax(depth - 1, False)
+                    finally:
+                        self.engine.undo_move(move, player)
+                    max_eval = max(max_eval, eval)
+                return max_eval
+            else:
+                min_eval = float('inf')
+                for move in self.get_all_moves(player):
+                    self.engine.make_move(move, player)
+                    try:
+                        eval = self.minimax(depth - 1, True)
+                    finally:
+                        self.engine.undo_move(move, player)
+                    min_eval = min(min_eval, eval)
+                return min_eval
+        finally:
             self.engine.turn_counter[player_index] -= 1  # Decrement turn counter
-            return min_eval
 
 
-    def alpha_beta(self, depth, is_maximizing_player, alpha=float('-inf'), beta=float('inf')):
+    def alpha_beta(self, depth, is_maximizing_player, alpha=float('-inf'), beta=float('inf'), ply=1):
         """
-        Minimax algorithm with Alpha-Beta Pruning.
+        Minimax algorithm with Alpha-Beta Pruning and a transposition table.
         Args:
             depth: The remaining depth to search.
             is_maximizing_player: True if it's the maximizing player's turn.
             alpha: The best value the maximizing player can guarantee so far.
             beta: The best value the minimizing player can guarantee so far.
+            ply: The distance from the root, used for killer moves.
         Returns:
             The evaluation score of the best move for the current player.
         """
+        self.check_deadline()
         if depth == 0 or self.engine.is_game_over():
             eval = self.evaluate_board()
             return eval
 
+        # Reuse a previous result for this position if it was searched deep enough
+        key = self.engine.zobrist_key
+        score, alpha, beta, hash_move = self.probe_transposition(key, depth, alpha, beta)
+        if score is not None:
+            return score
+        original_alpha, original_beta = alpha, beta
+
+        player = "Player 1" if is_maximizing_player else "Player 2"
         player_index = 0 if is_maximizing_player else 1
         self.engine.turn_counter[player_index] += 1  # Increment turn counter
 
-        if is_maximizing_player:
-            max_eval = float('-inf')
-            for move in self.get_all_moves("Player 1"):
-                self.engine.make_move(
-                    move, "Player 1" if is_maximizing_player else "Player 2")
-                eval = self.alpha_beta(depth - 1, False, alpha, beta)
-                self.engine.undo_move(
-                    move, "Player 1" if is_maximizing_player else "Player 2")
-                max_eval = max(max_eval, eval)
-                alpha = max(alpha, max_eval)
-                if beta <= alpha:  # Beta cut-off
-                    break
+        moves = self.generate_moves(player, ply, hash_move)
+
+        best_move = None
+        # try/finally keeps the board consistent when a SearchTimeout unwinds the search
+        try:
+            if is_maximizing_player:
+                best_eval = float('-inf')
+                for move in moves:
+                    if ply == 1 and self.root_bound is not None:
+                        # Another worker may have found a better root move since this search started
+                        beta = original_beta = min(beta, self.root_bound.value)
+                        if best_move is not None and beta <= alpha:
+                            break
+                    self.engine.make_move(move, player)
+                    try:
+                        eval = self.alpha_beta(depth - 1, False, alpha, beta, ply + 1)
+                    finally:
+                        self.engine.undo_move(move, player)
+                    if eval > best_eval or best_move is None:
+                        best_eval = eval
+                        best_move = move
+                    alpha = max(alpha, best_eval)
+                    if beta <= alpha:  # Beta cut-off
+                        self.move_orderer.record_cutoff(move, player, ply, depth)
+                        break
+            else:
+                best_eval = float('inf')
+                for move in moves:
+                    if ply == 1 and self.root_bound is not None:
+                        alpha = original_alpha = max(alpha, self.root_bound.value)
+                        if best_move is not None and beta <= alpha:
+                            break
+                    self.engine.make_move(move, player)
+                    try:
+                        eval = self.alpha_beta(depth - 1, True, alpha, beta, ply + 1)
+                    finally:
+                        self.engine.undo_move(move, player)
+                    if eval < best_eval or best_move is None:
+                        best_eval = eval
+                        best_move = move
+                    beta = min(beta, best_eval)
+                    if beta <= alpha:  # Alpha cut-off
+                        self.move_orderer.record_cutoff(move, player, ply, depth)
+                        break
+        finally:
             self.engine.turn_counter[player_index] -= 1  # Decrement turn counter
-            return max_eval
-        else:
-            min_eval = float('inf')
-            for move in self.get_all_moves("Player 2"):
-                self.engine.make_move(
-                    move, "Player 1" if is_maximizing_player else "Player 2")
-                eval = self.alpha_beta(depth - 1, True, alpha, beta)
-                self.engine.undo_move(
-                    move, "Player 1" if is_maximizing_player else "Player 2")
-                min_eval = min(min_eval, eval)
-                beta = min(beta, min_eval)
-                if beta <= alpha:  # Alpha cut-off
+
+        self.store_transposition(key, depth, best_eval, original_alpha, original_beta, best_move)
+        return best_eval
+
+
+    def pvs(self, depth, is_maximizing_player, alpha=float('-inf'), beta=float('inf'), ply=1):
+        """
+        Principal Variation Search: alpha_beta that searches the first move with the full window and
+        every later move with a null window, re-searching only the moves that turn out better.
+        Quiet moves ordered late are searched one ply shallower first (late move reductions).
+        Args:
+            depth: The remaining depth to search.
+            is_maximizing_player: True if it's the maximizing player's turn.
+            alpha: The best value the maximizing player can guarantee so far.
+            beta: The best value the minimizing player can guarantee so far.
+            ply: The distance from the root, used for killer moves.
+        Returns:
+            The evaluation score of the best move for the current player.
+        """
+        self.check_deadline()
+        if depth == 0 or self.engine.is_game_over():
+            return self.evaluate_board()
+
+        key = self.engine.zobrist_key
+        score, alpha, beta, hash_move = self.probe_transposition(key, depth, alpha, beta)
+        if score is not None:
+            return score
+        original_alpha, original_beta = alpha, beta
+
+        player = "Player 1" if is_maximizing_player else "Player 2"
+        player_index = 0 if is_maximizing_player else 1
+        self.engine.turn_counter[player_index] += 1  # Increment turn counter
+
+        best_eval = float('-inf') if is_maximizing_player else float('inf')
+        best_move = None
+        # try/finally keeps the board consistent when a SearchTimeout unwinds the search
+        try:
+            for index, move in enumerate(self.generate_moves(player, ply, hash_move)):
+                reduction = 0
+                if index >= LMR_FULL_DEPTH_MOVES and depth >= LMR_MIN_DEPTH and self.move_orderer.is_quiet(move, player, ply):
+                    reduction = 1
+
+                self.engine.make_move(move, player)
+                try:
+                    if is_maximizing_player:
+                        if best_move is None or alpha == float('-inf'):
+                            eval = self.pvs(depth - 1, False, alpha, beta, ply + 1)
+                        else:
+                            eval = self.pvs(depth - 1 - reduction, False, alpha, alpha + 1, ply + 1)
+                            if reduction and eval > alpha:  # The reduced search beat alpha, verify at full depth
+                                eval = self.pvs(depth - 1, False, alpha, alpha + 1, ply + 1)
+                            if alpha < eval < beta:
+                                eval = self.pvs(depth - 1, False, alpha, beta, ply + 1)
+                    else:
+                        if best_move is None or beta == float('inf'):
+                            eval = self.pvs(depth - 1, True, alpha, beta, ply + 1)
+                        else:
+                            eval = self.pvs(depth - 1 - reduction, True, beta - 1, beta, ply + 1)
+                            if reduction and eval < beta:  # The reduced search beat beta, verify at full depth
+                                eval = self.pvs(depth - 1, True, beta - 1, beta, ply + 1)
+                            if alpha < eval < beta:
+                                eval = self.pvs(depth - 1, True, alpha, beta, ply + 1)
+                finally:
+                    self.engine.undo_move(move, player)
+
+                if is_maximizing_player:
+                    if eval > best_eval or best_move is None:
+                        best_eval = eval
+                        best_move = move
+                    alpha = max(alpha, best_eval)
+                else:
+                    if eval < best_eval or best_move is None:
+                        best_eval = eval
+                        best_move = move
+                    beta = min(beta, best_eval)
+                if beta <= alpha:  # Cut-off
+                    self.move_orderer.record_cutoff(move, player, ply, depth)
                     break
+        finally:
             self.engine.turn_counter[player_index] -= 1  # Decrement turn counter
-            return min_eval
+
+        self.store_transposition(key, depth, best_eval, original_alpha, original_beta, best_move)
+        return best_eval
+
+
+    def probe_transposition(self, key, depth, alpha, beta):
+        """
+        Look a position up in the transposition table.
+        Returns:
+            (score, alpha, beta, hash_move): score is not None when the stored result answers the search,
+            otherwise alpha/beta are narrowed by a stored bound and hash_move is the stored best move (or None).
+        """
+        entry = self.transposition_table.probe(key)
+        if entry is None:
+            return None, alpha, beta, None
+        _, entry_depth, bound, score, hash_move, _ = entry
+        if entry_depth >= depth:
+            if bound == EXACT:
+                return score, alpha, beta, hash_move
+            if bound == LOWER_BOUND:
+                alpha = max(alpha, score)
+            else:
+                beta = min(beta, score)
+            if beta <= alpha:
+                return score, alpha, beta, hash_move
+        return None, alpha, beta, hash_move
+
+
+    def store_transposition(self, key, depth, best_eval, alpha, beta, best_move):
+        """Store a search result with its bound type, given the window (alpha, beta) it was searched with."""
+        if best_eval <= alpha:
+            bound = UPPER_BOUND
+        elif best_eval >= beta:
+            bound = LOWER_BOUND
+        else:
+            bound = EXACT
+        self.transposition_table.store(key, depth, bound, best_eval, best_move)
 
 
     def iterative_deepening(self, is_maximizing_player, max_depth, time_limit):
+        # Book positions are answered without searching, unless the book move is not legal here
+        # (e.g. it maps outside the board); the position is then searched as usual
+        if self.opening_book is not None:
+            player = "Player 1" if is_maximizing_player else "Player 2"
+            book_move = self.opening_book.get_move(self.engine, player)
+            if book_move is not None and self.is_legal_move(player, book_move):
+                return book_move
+
         start_time = time.time()
         best_move = None
+        self.nodes = 0
+        self.completed_depth = 0
+        self.best_move = None
+        self.search_start_time = start_time
+
+        # Forced Bee surrounds are played at once, and moves allowing one are not searched.
+        # Positions where neither Bee has few enough free neighbors skip the solver.
+        self.losing_moves = set()
+        if self.mate_plies > 0 and not self.engine.is_game_over():
+            player = "Player 1" if is_maximizing_player else "Player 2"
+            mate_time_limit = self.mate_time_limit if self.mate_time_limit is not None else time_limit * MATE_TIME_FRACTION
+            mate_deadline = start_time + mate_time_limit
+            if self.mate_solver.can_surround(player, (self.mate_plies + 1) // 2):
+                winning_move = self.mate_solver.find_forced_win(player, self.mate_plies, mate_deadline)
+                if winning_move is not None:
+                    self.best_score = SURROUNDED_WEIGHT if is_maximizing_player else -SURROUNDED_WEIGHT
+                    return winning_move
+            if self.mate_plies > 1 and self.mate_solver.may_lose_bee(player, self.mate_plies // 2):
+                self.losing_moves = self.mate_solver.find_losing_moves(player, self.get_all_moves(player),
+                                                                       self.mate_plies, mate_deadline)
+
+        self.search_count += 1
+        self.transposition_table.new_search()
+        self.move_orderer.new_search()
+        search = self.find_best_move_parallel if self.search_mode == "root_parallel" else self.find_best_move
+        helpers = self.start_helpers(is_maximizing_player, max_depth, start_time, time_limit) if self.search_mode == "lazy_smp" else []
+        previous_score = None
 
         for depth in range(1, max_depth + 1):
             # Check if time is up
@@ -108,15 +404,72 @@ class HiveAI:
             fully_evaluated = True
 
             # Find the best move for the current depth
-            current_move, fully_evaluated = self.find_best_move(depth, is_maximizing_player, start_time, time_limit)
+            if self.search_mode == "pvs" and depth > 1 and previous_score is not None and abs(previous_score) < float('inf'):
+                # Aspiration window around the previous depth's score, searched again in full if the score falls outside
+                alpha, beta = previous_score - ASPIRATION_WINDOW, previous_score + ASPIRATION_WINDOW
+                current_move, fully_evaluated = search(depth, is_maximizing_player, start_time, time_limit, alpha, beta)
+                if fully_evaluated and not alpha < self.best_score < beta:
+                    current_move, fully_evaluated = search(depth, is_maximizing_player, start_time, time_limit)
+            else:
+                current_move, fully_evaluated = search(depth, is_maximizing_player, start_time, time_limit)
+            if fully_evaluated:
+                previous_score = self.best_score
+                self.completed_depth = depth
 
             # Update the best move only if the depth was fully evaluated
             if (fully_evaluated or depth == 1) and current_move is not None:
                 best_move = current_move
+                self.best_move = best_move
 
+            # The deadline interrupted this depth, so there is no time for a deeper one
+            if not fully_evaluated:
+                break
+
+        self.stop_helpers(helpers)
+        self.deadline = None
         return best_move
 
 
+    def get_progress(self):
+        """
+        Get the progress of the running (or last) search, safe to call from another thread.
+        Returns:
+            (completed depth, best move so far, nodes per second)
+        """
+        if self.search_start_time is None:
+            return 0, None, 0
+        elapsed = max(time.time() - self.search_start_time, 1e-6)
+        return self.completed_depth, self.best_move, int(self.nodes / elapsed)
+
+
+    def start_helpers(self, is_maximizing_player, max_depth, start_time, time_limit):
+        """
+        Lazy SMP: start `workers - 1` helper searches of the root in the worker processes.
+        They only fill the shared transposition table, the main search still picks the move.
+        Returns:
+            The futures of the helpers, to pass to stop_helpers.
+        """
+        if self.workers < 2:
+            return []
+        pool = self.get_pool()
+        snapshot = pickle.dumps(self.engine)
+        generation = self.transposition_table.generation
+        return [
+            pool.submit(search_helper, helper_index, snapshot, is_maximizing_player, max_depth, start_time, time_limit, generation)
+            for helper_index in range(1, self.workers)
+        ]
+
+
+    def stop_helpers(self, helpers):
+        """Stop the Lazy SMP helpers and wait for them, so the next search does not queue behind them."""
+        if not helpers:
+            return
+        self._stop_flag.value = True
+        for helper in helpers:
+            self.nodes += helper.result()
+        self._stop_flag.value = False
+
+
     def evaluate_board(self):
         """
         Evaluate the board state and assign a score to determine which player has the advantage.
@@ -126,15 +479,10 @@ class HiveAI:
         """
         score = 0
 
-        # Weight constants for evaluation criteria
-        THREAT_WEIGHT = 800
-        MOBILITY_WEIGHT = 5
-        PIECE_COUNT_WEIGHT = 3
-
         if self.engine.check_bee_surrounded("Player 1"):
-            score -= 10000  # Heavy penalty if Player 1's Bee is surrounded
+            score -= SURROUNDED_WEIGHT  # Heavy penalty if Player 1's Bee is surrounded
         if self.engine.check_bee_surrounded("Player 2"):
-            score += 10000  # Reward if Player 2's Bee is surrounded
+            score += SURROUNDED_WEIGHT  # Reward if Player 2's Bee is surrounded
 
         # Evaluate each player
         for player in ["Player 1", "Player 2"]:
@@ -146,8 +494,7 @@ class HiveAI:
             score += multiplier * bee_threat * THREAT_WEIGHT
 
             # Mobility
-            all_moves = self.get_all_moves(player)
-            score += multiplier * len(all_moves) * MOBILITY_WEIGHT
+            score += multiplier * self.get_mobility(player) * MOBILITY_WEIGHT
 
             # Piece Count
             piece_count = self.count_pieces(player)
@@ -156,100 +503,223 @@ class HiveAI:
         return score
 
 
+    def get_mobility(self, player):
+        """Get the mobility of a player for the evaluation, exact or estimated depending on mobility_mode."""
+        if self.mobility_mode == "exact":
+            return len(self.get_all_moves(player))
+        return self.get_pseudo_mobility(player)
+
+
     def get_bee_threat(self, player):
         """Count how many neighbors surround the Bee for the given player."""
         # Retrieve the bee's coordinates directly
         player_index = 0 if player == "Player 1" else 1
         if self.engine.bee_placed[player_index]:
-            row, col = self.engine.bee_coordinates[player_index]
-            neighbors = self.engine.boardState.get_neighbors(row, col)  # Get all neighbor positions
-            occupied_count = 0  # Initialize the counter
-
-            for r, c in neighbors:
-                if self.engine.boardState.is_cell_occupied(r, c):  # Check if the neighbor is occupied
-                    occupied_count += 1  # Increment the counter
-            return occupied_count
+            return self.engine.bee_threat[player_index]  # Kept up to date by make_move/undo_move
         return 0
 
 
+    def get_pseudo_mobility(self, player):
+        """
+        Cheap estimate of len(get_all_moves(player)) for the evaluation, read from counters kept by
+        make_move/undo_move: the steps of the player's top pieces (see HiveGame.get_step_count), once
+        the Bee is placed, and every cell the player may place on once per piece type left in hand.
+        Pinned pieces are counted as well, since the one hive rule is not local to a move.
+        """
+        player_index = 0 if player == "Player 1" else 1
+        mobility = self.engine.step_mobility[player_index] if self.engine.bee_placed[player_index] else 0
+        piece_types_in_hand = sum(1 for count in self.engine.player_pieces[player].values() if count > 0)
+        mobility += len(self.engine.boardState.placeable[player_index]) * piece_types_in_hand
+        return mobility
+
+
     def count_pieces(self, player):
         """Count the number of pieces for the given player."""
-        player_index = 0 if player == "Player 1" else 1
-        return len(self.engine.boardState.pieces_on_board[player_index])
+        return self.engine.piece_count[0 if player == "Player 1" else 1]  # Kept up to date by make_move/undo_move
 
 
     def get_all_empty_neighbors(self):
         """Get all empty neighbors around the hive."""
-        empty_neighbors = set()
-        for player_pieces in self.engine.boardState.pieces_on_board:
-            for row, col, _ in player_pieces:
-                for neighbor in self.engine.boardState.get_neighbors(row, col):
-                    if self.engine.boardState.board[neighbor[0]][neighbor[1]] is None:
-                        empty_neighbors.add(neighbor)
-        return empty_neighbors
+        return self.engine.boardState.get_empty_neighbors()
 
 
-    def get_all_moves(self, player):
-        """Get all possible moves for a given player."""
-        all_moves = []
+    def get_movable_pieces(self, player):
+        """Get the cells whose top piece belongs to the player (only once the player's Bee is placed)."""
         player_index = 0 if player == "Player 1" else 1
-
-        # If the Bee hasn't been placed, restrict to placement moves only
         if not self.engine.bee_placed[player_index]:
-            if self.engine.turn_counter[player_index] >= 3:
-                for neighbor in self.get_all_empty_neighbors():
-                    row, col = neighbor
-                    if self.engine.is_placement_valid(player, row, col, "Bee"):
-                        all_moves.append((None, (row, col, "Bee")))
-            else:
-                if self.engine.turn_counter[0] == 0 and self.engine.turn_counter[1] == 0:
-                    # Define the center of the board
-                    center_row = (int)(self.engine.boardState.board_size / 2)
-                    center_col = (int)(self.engine.boardState.board_size / 2)
-                    for piece, count in self.engine.player_pieces[player].items():
-                        if count > 0:  # Only consider pieces still in hand
-                            if self.engine.is_placement_valid(player, center_row, center_col, piece):
-                                all_moves.append((None, (center_row, center_col, piece)))
-                else:
-                    for piece, count in self.engine.player_pieces[player].items():
-                        if count > 0:  # Only consider pieces still in hand
-                            for neighbor in self.get_all_empty_neighbors():
-                                row, col = neighbor
-                                if self.engine.is_placement_valid(player, row, col, piece):
-                                    all_moves.append((None, (row, col, piece)))  # (None, (placement info))
-            return all_moves
+            return []
 
-        # Generate moves for pieces already on the board (if the Bee is placed)
+        movable = []
         for row, col, piece_character in self.engine.boardState.pieces_on_board[player_index]:
-            cell_content = self.engine.boardState.board[row][col]
-            top_piece = cell_content[-1] if isinstance(cell_content, list) else cell_content
+            top_piece = self.engine.boardState.get_top_piece(row, col)
 
             # Ensure both player and character match
-            if top_piece == (player, piece_character) and self.engine.is_on_top_of_stack(top_piece, row, col):
-                piece_moves = self.engine.get_piece_moves(row, col)
-                for move in piece_moves:
-                    all_moves.append(((row, col), move))
+            if top_piece == (player, piece_character) and (row, col) not in movable:
+                movable.append((row, col))
+        return movable
+
+
+    def get_placeable_piece_types(self, player):
+        """Get the piece types the player may place this turn."""
+        player_index = 0 if player == "Player 1" else 1
+        in_hand = [piece for piece, count in self.engine.player_pieces[player].items() if count > 0]
+
+        # The Bee must be placed by the player's 4th turn
+        if not self.engine.bee_placed[player_index] and self.engine.turn_counter[player_index] >= 3:
+            return [piece for piece in in_hand if piece == "Bee"]
+        return in_hand
+
+
+    def get_placement_cells(self, player):
+        """Get the cells where the player may try to place a piece (validated separately)."""
+        if self.engine.turn_counter[0] == 0 and self.engine.turn_counter[1] == 0:
+            # The first piece goes to the center of the board
+            center_row = (int)(self.engine.boardState.board_size / 2)
+            center_col = (int)(self.engine.boardState.board_size / 2)
+            return {(center_row, center_col)}
+
+        # On the first turn any cell touching the hive works, afterwards only cells touching friendly pieces
+        player_index = 0 if player == "Player 1" else 1
+        if self.engine.turn_counter[player_index] == 0:
+            return self.get_all_empty_neighbors()
+        return set(self.engine.boardState.placeable[player_index])
+
+
+    def get_all_moves(self, player):
+        """Get all possible moves for a given player."""
+        all_moves = []
+
+        # Generate moves for pieces already on the board (if the Bee is placed)
+        for row, col in self.get_movable_pieces(player):
+            for move in self.engine.get_piece_moves(row, col):
+                all_moves.append(((row, col), move))
 
         # Add placement moves for remaining pieces in hand
-        for piece, count in self.engine.player_pieces[player].items():
-            if count > 0:  # Only consider pieces still in hand
-                for neighbor in self.get_all_empty_neighbors():
-                    row, col = neighbor
-                    if self.engine.is_placement_valid(player, row, col, piece):
-                        all_moves.append((None, (row, col, piece)))  # (None, (placement info))
+        placement_cells = self.get_placement_cells(player)
+        for piece in self.get_placeable_piece_types(player):
+            for row, col in placement_cells:
+                if self.engine.is_placement_valid(player, row, col, piece):
+                    all_moves.append((None, (row, col, piece)))  # (None, (placement info))
 
         return all_moves
 
 
-    def find_best_move(self, depth, is_maximizing_player, start_time, time_limit):
+    def is_legal_move(self, player, move):
+        """Check a move that did not come from the move generator (book or hash move) against the position."""
+        return next(self.generate_moves(player, hash_move=move), None) == move
+
+
+    def generate_moves(self, player, ply=0, hash_move=None):
+        """
+        Yield the legal moves of a player lazily, in stages:
+        1. the hash move (best move from the transposition table),
+        2. placements next to the opponent's Bee, and moves onto cells next to it by the pieces close to it
+           (see BoardState.get_attack_origins),
+        3. killer moves for this ply,
+        4. the other piece moves, by history score,
+        5. the other placements, by history score.
+        Nothing is generated or validated for a stage the search never reaches after a cut-off.
+        """
+        player_index = 0 if player == "Player 1" else 1
+        opponent_index = 1 - player_index
+        orderer = self.move_orderer
+        yielded = set()
+
+        movable = self.get_movable_pieces(player)
+        placement_types = self.get_placeable_piece_types(player)
+        placement_cells = self.get_placement_cells(player) if placement_types else set()
+        piece_moves = {}  # origin -> destinations, generated at most once per origin
+
+        def moves_from(origin):
+            if origin not in piece_moves:
+                piece_moves[origin] = self.engine.get_piece_moves(*origin)
+            return piece_moves[origin]
+
+        def is_legal(move):
+            origin, destination = move
+            if origin is None:
+                return (destination[2] in placement_types and (destination[0], destination[1]) in placement_cells
+                        and self.engine.is_placement_valid(player, *destination))
+            return origin in movable and destination in moves_from(origin)
+
+        # Stage 1: hash move
+        if hash_move is not None and is_legal(hash_move):
+            yielded.add(hash_move)
+            yield hash_move
+
+        # Stage 2: moves next to the opponent's Bee
+        if self.engine.bee_placed[opponent_index]:
+            bee_neighbors = self.engine.boardState.get_neighbors(*self.engine.bee_coordinates[opponent_index])
+            for row, col in bee_neighbors:
+                if (row, col) not in placement_cells:
+                    continue
+                for piece in placement_types:
+                    move = (None, (row, col, piece))
+                    if move not in yielded and self.engine.is_placement_valid(player, row, col, piece):
+                        yielded.add(move)
+                        yield move
+            # Only the pieces close enough to the Bee have their moves generated this early
+            attack_origins = self.engine.boardState.get_attack_origins(bee_neighbors, player)
+            for origin in movable:
+                if origin not in attack_origins:
+                    continue
+                for destination in moves_from(origin):
+                    move = (origin, destination)
+                    if destination in bee_neighbors and move not in yielded:
+                        yielded.add(move)
+                        yield move
+
+        # Stage 3: killer moves
+        for move in orderer.get_killers(ply):
+            if move not in yielded and is_legal(move):
+                yielded.add(move)
+                yield move
+
+        # Stage 4: the remaining piece moves
+        for origin in movable:
+            destinations = sorted(moves_from(origin), key=lambda destination: -orderer.history_score(player, (origin, destination)))
+            for destination in destinations:
+                move = (origin, destination)
+                if move not in yielded:
+                    yield move
+
+        # Stage 5: the remaining placements, validated one at a time
+        placements = [(None, (row, col, piece)) for piece in placement_types for row, col in placement_cells]
+        placements.sort(key=lambda move: -orderer.history_score(player, move))
+        for move in placements:
+            if move not in yielded and self.engine.is_placement_valid(player, *move[1]):
+                yield move
+
+
+    def find_best_move(self, depth, is_maximizing_player, start_time, time_limit, alpha=float('-inf'), beta=float('inf')):
+        """
+        Search every root move to the given depth.
+        Args:
+            alpha, beta: Root window; with an aspiration window the score stored in best_score may only be a
+                bound if it falls outside of it.
+        Returns:
+            (best_move, fully_evaluated); the score of best_move is kept in self.best_score.
+        """
         best_eval = float('-inf') if is_maximizing_player else float('inf')
         best_move = None
+        search = self.pvs if self.search_mode == "pvs" else self.alpha_beta
 
         player = "Player 1" if is_maximizing_player else "Player 2"
         player_index = 0 if is_maximizing_player else 1
 
-        moves = self.get_all_moves(player)
         fully_evaluated = True  # Assume the depth will be fully evaluated
+        # Depth 1 always completes so there is a move to play, deeper searches stop at the deadline
+        self.deadline = start_time + time_limit if depth > 1 else None
+
+        # Search the best move of the previous depth first
+        key = self.engine.zobrist_key
+        entry = self.transposition_table.probe(key)
+        pv_move = entry[4] if entry is not None else None
+        moves = self.filter_root_moves(list(self.generate_moves(player, 0, pv_move)), player)
+        if self.root_order_rng is not None:
+            later_moves = moves[1:]
+            self.root_order_rng.shuffle(later_moves)
+            moves[1:] = later_moves
 
         for move in moves:
             # Check timeout before making a move
@@ -260,15 +730,287 @@ class HiveAI:
             # Simulate the move
             self.engine.make_move(move, player)
             self.engine.turn_counter[player_index] += 1
-            # Recursively evaluate using alpha-beta pruning
-            eval = self.alpha_beta(depth - 1, not is_maximizing_player, alpha=float('-inf'), beta=float('inf'))
-
-            # Undo the move
-            self.engine.undo_move(move, player)
-            self.engine.turn_counter[player_index] -= 1
+            try:
+                # Recursively evaluate using alpha-beta pruning, only a better score than the best so far matters
+                if is_maximizing_player:
+                    lower = max(alpha, best_eval)
+                    if self.search_mode == "pvs" and best_move is not None:
+                        # Prove the move is no better with a null window, search it fully only if it is
+                        eval = search(depth - 1, False, alpha=lower, beta=lower + 1)
+                        if lower < eval < beta:
+                            eval = search(depth - 1, False, alpha=lower, beta=beta)
+                    else:
+                        eval = search(depth - 1, False, alpha=lower, beta=beta)
+                else:
+                    upper = min(beta, best_eval)
+                    if self.search_mode == "pvs" and best_move is not None:
+                        eval = search(depth - 1, True, alpha=upper - 1, beta=upper)
+                        if alpha < eval < upper:
+                            eval = search(depth - 1, True, alpha=alpha, beta=upper)
+                    else:
+                        eval = search(depth - 1, True, alpha=alpha, beta=upper)
+            except SearchTimeout:
+                fully_evaluated = False  # The deadline passed inside this move's subtree
+                break
+            finally:
+                # Undo the move
+                self.engine.undo_move(move, player)
+                self.engine.turn_counter[player_index] -= 1
 
             # Update the best move and evaluation
             if (is_maximizing_player and eval > best_eval) or (not is_maximizing_player and eval < best_eval):
                 best_eval = eval
                 best_move = move
+
+            # Above the aspiration window the real score is unknown, iterative_deepening searches again
+            if (is_maximizing_player and best_eval >= beta) or (not is_maximizing_player and best_eval <= alpha):
+                break
+
+        self.best_score = best_eval
+        if fully_evaluated and best_move is not None:
+            self.store_transposition(key, depth, best_eval, alpha, beta, best_move)
+        return best_move, fully_evaluated
+
+
+    def filter_root_moves(self, moves, player):
+        """Drop symmetric duplicates and the moves proven to lose, unless every move loses."""
+        moves = self.remove_symmetric_moves(moves, player)
+        safe_moves = [move for move in moves if move not in self.losing_moves]
+        return safe_moves or moves
+
+
+    def remove_symmetric_moves(self, moves, player):
+        """
+        Drop the root moves that lead to a position symmetric to the one of an earlier move.
+        Only done early in the game, when such duplicates are common and canonicalize is cheap.
+        """
+        board_state = self.engine.boardState
+        if len(board_state.pieces_on_board[0]) + len(board_state.pieces_on_board[1]) >= ROOT_SYMMETRY_MAX_PIECES:
+            return moves
+        opponent = "Player 2" if player == "Player 1" else "Player 1"
+        seen = set()
+        unique_moves = []
+        for move in moves:
+            self.engine.make_move(move, player)
+            try:
+                key, _ = canonicalize(board_state, self.engine.player_pieces, opponent)
+            finally:
+                self.engine.undo_move(move, player)
+            if key not in seen:
+                seen.add(key)
+                unique_moves.append(move)
+        return unique_moves
+
+
+    def find_best_move_parallel(self, depth, is_maximizing_player, start_time, time_limit):
+        """
+        Root-parallel find_best_move: the root moves are searched by a pool of worker processes,
+        each on its own copy of the game. The PV move is searched first, and every later move is searched
+        against the best root score found so far by any worker, read again at every child of the move,
+        so it can still be cut off.
+        Returns:
+            (best_move, fully_evaluated) like find_best_move.
+        """
+        player = "Player 1" if is_maximizing_player else "Player 2"
+        deadline = start_time + time_limit if depth > 1 else None
+
+        key = self.engine.zobrist_key
+        entry = self.transposition_table.probe(key)
+        pv_move = entry[4] if entry is not None else None
+        moves = self.filter_root_moves(list(self.generate_moves(player, 0, pv_move)), player)
+        if not moves:
+            return None, True
+
+        pool = self.get_pool()
+        self._root_bound.value = float('-inf') if is_maximizing_player else float('inf')
+        # Pickle the game once here: the pool pickles task arguments later, on its own thread
+        snapshot = pickle.dumps(self.engine)
+        task = (snapshot, depth, is_maximizing_player, deadline, self.search_count)
+
+        results = [self.wait_for_worker(pool.submit(search_root_move, moves[0], *task))]
+        if results[0][1] is not None:
+            futures = [pool.submit(search_root_move, move, *task) for move in moves[1:]]
+            for future in futures:
+                results.append(self.wait_for_worker(future))
+                if results[-1][1] is None:  # The deadline passed, drop the moves nobody started yet
+                    for pending in futures:
+                        pending.cancel()
+                    break
+
+        best_eval = float('-inf') if is_maximizing_player else float('inf')
+        best_move = None
+        fully_evaluated = True
+        for move, eval, nodes in results:
+            self.nodes += nodes
+            if eval is None:
+                fully_evaluated = False
+                continue
+            if (is_maximizing_player and eval > best_eval) or (not is_maximizing_player and eval < best_eval):
+                best_eval = eval
+                best_move = move
+
+        self._stop_flag.value = False
+        self.best_score = best_eval
+        if fully_evaluated and best_move is not None:
+            self.transposition_table.store(key, depth, EXACT, best_eval, best_move)
         return best_move, fully_evaluated
+
+
+    def wait_for_worker(self, future):
+        """Wait for a root-parallel task, passing a stop request of this search on to the workers."""
+        while True:
+            try:
+                return future.result(timeout=WORKER_POLL_INTERVAL)
+            except FutureTimeout:
+                if self.stop_flag is not None and self.stop_flag.value:
+                    self._stop_flag.value = True
+
+
+    def get_pool(self):
+        """
+        Start the worker processes for the current search mode on first use. They and their tables are
+        reused by later searches, and restarted if the search or mobility mode changed.
+        """
+        if self._pool is not None and self._pool_mode != (self.search_mode, self.mobility_mode):
+            self.close_pool()
+        if self._pool is None:
+            if self.search_mode == "lazy_smp":
+                if not isinstance(self.transposition_table, SharedTranspositionTable):
+                    self.transposition_table = SharedTranspositionTable(self.tt_size_mb)
+                self._stop_flag = multiprocessing.Value('b', False)
+                max_workers = self.workers - 1  # The main process is the last searcher
+                initializer = init_smp_worker
+                initargs = (self.transposition_table.name, self.tt_size_mb, self.mobility_mode, self._stop_flag)
+            else:
+                self._root_bound = multiprocessing.Value('d', 0.0)
+                self._stop_flag = multiprocessing.Value('b', False)
+                max_workers = self.workers
+                initializer = init_root_worker
+                initargs = (self._root_bound, self.tt_size_mb, self.mobility_mode, self._stop_flag)
+            self._pool = ProcessPoolExecutor(max_workers=max_workers, initializer=initializer, initargs=initargs)
+            self._pool_mode = (self.search_mode, self.mobility_mode)
+        return self._pool
+
+
+    def close_pool(self):
+        """Shut down the worker processes, if any were started."""
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+            self._pool_mode = None
+            self._root_bound = None
+            self._stop_flag = None
+
+
+    def close(self):
+        """Shut down the worker processes and free the shared transposition table, if any."""
+        self.close_pool()
+        if isinstance(self.transposition_table, SharedTranspositionTable):
+            self.transposition_table.close()
+            self.transposition_table = TranspositionTable(self.tt_size_mb)
+
+
+# State of a root-parallel worker process, set up once by init_root_worker
+_worker_ai = None
+_worker_search_count = None
+_worker_root_bound = None
+
+
+def init_root_worker(root_bound, tt_size_mb, mobility_mode, stop_flag):
+    """
+    Pool initializer: keep the shared best root score and a HiveAI whose tables live as long as the process,
+    stopped through the stop flag of the main search.
+    """
+    global _worker_ai, _worker_root_bound
+    _worker_root_bound = root_bound
+    _worker_ai = HiveAI(None, tt_size_mb, mobility_mode)
+    _worker_ai.root_bound = root_bound
+    _worker_ai.stop_flag = stop_flag
+
+
+def search_root_move(move, snapshot, depth, is_maximizing_player, deadline, search_count):
+    """
+    Search one root move in a worker process.
+    Args:
+        move: The root move to search.
+        snapshot: The pickled HiveGame at the root.
+        depth, is_maximizing_player: As in find_best_move.
+        deadline: time.time() after which the search is abandoned, or None.
+        search_count: The HiveAI.search_count of the search this move belongs to.
+    Returns:
+        (move, eval, nodes), with eval None if the deadline passed or the search was stopped first.
+    """
+    global _worker_search_count
+    ai = _worker_ai
+    engine = pickle.loads(snapshot)
+    ai.engine = engine
+    ai.move_orderer.engine = engine
+    if search_count != _worker_search_count:
+        _worker_search_count = search_count
+        ai.transposition_table.new_search()
+        ai.move_orderer.new_search()
+    ai.nodes = 0
+    if deadline is not None and time.time() >= deadline:
+        return move, None, 0
+
+    player = "Player 1" if is_maximizing_player else "Player 2"
+    player_index = 0 if is_maximizing_player else 1
+    bound = _worker_root_bound.value  # Best root score found so far by any worker
+    # The engine is a throwaway copy, so the move is never undone
+    engine.make_move(move, player)
+    engine.turn_counter[player_index] += 1
+    ai.deadline = deadline
+    try:
+        if is_maximizing_player:
+            eval = ai.alpha_beta(depth - 1, False, alpha=bound, beta=float('inf'))
+        else:
+            eval = ai.alpha_beta(depth - 1, True, alpha=float('-inf'), beta=bound)
+    except SearchTimeout:
+        return move, None, ai.nodes
+    finally:
+        ai.deadline = None
+
+    with _worker_root_bound.get_lock():
+        if (is_maximizing_player and eval > _worker_root_bound.value) or (not is_maximizing_player and eval < _worker_root_bound.value):
+            _worker_root_bound.value = eval
+    return move, eval, ai.nodes
+
+
+def init_smp_worker(table_name, tt_size_mb, mobility_mode, stop_flag):
+    """Pool initializer: attach a HiveAI to the shared transposition table and the stop flag of the main search."""
+    global _worker_ai
+    _worker_ai = HiveAI(None, tt_size_mb, mobility_mode)
+    _worker_ai.transposition_table = SharedTranspositionTable(tt_size_mb, name=table_name)
+    _worker_ai.stop_flag = stop_flag
+
+
+def search_helper(helper_index, snapshot, is_maximizing_player, max_depth, start_time, time_limit, generation):
+    """
+    Lazy SMP helper: run iterative deepening on the root in a worker process until the main search stops it.
+    Odd helpers start one depth ahead and each helper shuffles its root moves differently, so the helpers
+    fill the shared table with results the main search has not reached yet.
+    Args:
+        helper_index: 1 to workers - 1.
+        snapshot: The pickled HiveGame at the root.
+        is_maximizing_player, max_depth, start_time, time_limit: As in iterative_deepening.
+        generation: The shared table's generation of the main search.
+    Returns:
+        The number of nodes searched.
+    """
+    ai = _worker_ai
+    engine = pickle.loads(snapshot)
+    ai.engine = engine
+    ai.move_orderer.engine = engine
+    ai.move_orderer.new_search()
+    ai.transposition_table.generation = generation
+    ai.root_order_rng = random.Random(helper_index << 8 | generation)
+    ai.nodes = 0
+
+    for depth in range(1 + helper_index % 2, max_depth + 1):
+        if ai.stop_flag.value or time.time() - start_time >= time_limit:
+            break
+        _, fully_evaluated = ai.find_best_move(depth, is_maximizing_player, start_time, time_limit)
+        if not fully_evaluated:
+            break
+    ai.deadline = None
+    return ai.nodes
@@ -0,0 +1,213 @@
+import time
+
+# How many solver nodes are searched between two looks at the clock
+NODE_CHECK_INTERVAL = 32
+
+
+class SolverTimeout(Exception):
+    """Raised inside the solver when its deadline has passed."""
+
+
+class MateSolver:
+    """
+    Threat-space AND/OR search for forced Bee surrounds.
+    The attacker only plays moves that add a piece next to the defender's Bee, while the defender
+    tries every legal move (moving pieces away, moving the Bee, counter-attacking...). A win is only
+    proven if every defence fails, so reported wins are forced; wins that need a quiet move are not found.
+    """
+
+    def __init__(self, ai):
+        # HiveAI providing the engine and move generation
+        self.ai = ai
+        self.deadline = None
+        self.nodes = 0
+        self.proven = {}  # (zobrist key, attacking moves left) -> whether the attacker to move wins
+
+
+    def check_deadline(self):
+        """Count a node and abort the solver if the deadline has passed or the AI was stopped (polled every NODE_CHECK_INTERVAL nodes)."""
+        self.nodes += 1
+        if self.nodes % NODE_CHECK_INTERVAL != 0:
+            return
+        stop_flag = self.ai.stop_flag
+        if (self.deadline is not None and time.time() >= self.deadline) or (stop_flag is not None and stop_flag.value):
+            raise SolverTimeout()
+
+
+    def can_surround(self, attacker, attacks):
+        """
+        Cheap precondition of winning_move: the defender's Bee is placed and has no more free neighbors
+        than `attacks` attacking moves can fill.
+        """
+        engine = self.ai.engine
+        defender_index = 1 if attacker == "Player 1" else 0
+        if not engine.bee_placed[defender_index]:
+            return False
+        bee_neighbors = engine.boardState.get_neighbors(*engine.bee_coordinates[defender_index])
+        return len(bee_neighbors) - engine.bee_threat[defender_index] <= attacks
+
+
+    def may_lose_bee(self, player, attacks):
+        """
+        Cheap precondition of find_losing_moves: after some move of the player, its Bee may have no more free
+        neighbors than the opponent's `attacks` attacking moves can fill. A move fills at most one cell next to
+        the Bee, unless it moves or places the Bee itself, whose possible cells are then checked.
+        """
+        engine = self.ai.engine
+        board_state = engine.boardState
+        player_index = 0 if player == "Player 1" else 1
+        if engine.bee_placed[player_index]:
+            bee = engine.bee_coordinates[player_index]
+            if len(board_state.get_neighbors(*bee)) - engine.bee_threat[player_index] - 1 <= attacks:
+                return True
+            if board_state.get_top_piece(*bee) != (player, "Bee"):
+                return False  # A Beetle on top keeps the Bee in place
+            cells, vacated = engine.get_piece_moves(*bee), bee
+        elif engine.player_pieces[player]["Bee"] > 0:
+            cells, vacated = self.ai.get_placement_cells(player), None
+        else:
+            return False
+        return any(len(board_state.get_neighbors(*cell)) - board_state.count_occupied_neighbors(*cell, exclude=vacated) <= attacks
+                   for cell in cells)
+
+
+    def find_forced_win(self, player, max_plies, deadline=None):
+        """
+        Look for a forced surround of the opponent's Bee within max_plies plies, player moving first.
+        Shorter wins are looked for first.
+        Returns:
+            The first move of the win, or None if none was found before the deadline.
+        """
+        self.deadline = deadline
+        self.proven = {}
+        try:
+            for attacks in range(1, (max_plies + 1) // 2 + 1):
+                move = self.winning_move(player, attacks)
+                if move is not None:
+                    return move
+        except SolverTimeout:
+            pass
+        finally:
+            self.deadline = None
+        return None
+
+
+    def find_losing_moves(self, player, moves, max_plies, deadline=None):
+        """
+        Get the moves after which the opponent has a forced win within the remaining max_plies - 1 plies.
+        Returns:
+            The set of losing moves proven before the deadline.
+        """
+        engine = self.ai.engine
+        opponent = "Player 2" if player == "Player 1" else "Player 1"
+        player_index = 0 if player == "Player 1" else 1
+        self.deadline = deadline
+        self.proven = {}
+        losing_moves = set()
+        try:
+            for move in moves:
+                engine.make_move(move, player)
+                engine.turn_counter[player_index] += 1
+                try:
+                    if self.is_win(opponent, player):
+                        losing_moves.add(move)
+                    elif not engine.is_game_over() and self.winning_move(opponent, max_plies // 2) is not None:
+                        losing_moves.add(move)
+                finally:
+                    engine.turn_counter[player_index] -= 1
+                    engine.undo_move(move, player)
+        except SolverTimeout:
+            pass
+        finally:
+            self.deadline = None
+        return losing_moves
+
+
+    def winning_move(self, attacker, attacks):
+        """
+        OR node: find an attacking move that wins by force with at most `attacks` attacking moves.
+        Returns:
+            The winning move, or None.
+        """
+        self.check_deadline()
+        engine = self.ai.engine
+        defender = "Player 2" if attacker == "Player 1" else "Player 1"
+        defender_index = 1 if attacker == "Player 1" else 0
+        if not engine.bee_placed[defender_index]:
+            return None
+        # Every attacking move adds one piece next to the Bee, too many free cells cannot be filled in time
+        bee_neighbors = engine.boardState.get_neighbors(*engine.bee_coordinates[defender_index])
+        if len(bee_neighbors) - engine.bee_threat[defender_index] > attacks:
+            return None
+        key = (engine.zobrist_key, attacks)
+        if self.proven.get(key) is False:
+            return None
+
+        attacker_index = 1 - defender_index
+        for move in self.attacking_moves(attacker, bee_neighbors):
+            engine.make_move(move, attacker)
+            engine.turn_counter[attacker_index] += 1
+            try:
+                if self.is_win(attacker, defender):
+                    wins = True
+                elif attacks > 1 and not engine.check_bee_surrounded(attacker):
+                    wins = self.defence_fails(attacker, defender, attacks - 1)
+                else:
+                    wins = False
+            finally:
+                engine.turn_counter[attacker_index] -= 1
+                engine.undo_move(move, attacker)
+            if wins:
+                self.proven[key] = True
+                return move
+        self.proven[key] = False
+        return None
+
+
+    def defence_fails(self, attacker, defender, attacks):
+        """AND node: check that every defender move (or a pass, without moves) still loses."""
+        self.check_deadline()
+        engine = self.ai.engine
+        defender_index = 1 if attacker == "Player 1" else 0
+        has_moves = False
+        for move in self.ai.generate_moves(defender):
+            has_moves = True
+            engine.make_move(move, defender)
+            engine.turn_counter[defender_index] += 1
+            try:
+                if engine.check_bee_surrounded(attacker):
+                    refuted = True  # The defender surrounded the attacker's Bee (or both Bees) first
+                else:
+                    refuted = self.winning_move(attacker, attacks) is None
+            finally:
+                engine.turn_counter[defender_index] -= 1
+                engine.undo_move(move, defender)
+            if refuted:
+                return False
+        if not has_moves:
+            engine.pass_turn()
+            try:
+                return self.winning_move(attacker, attacks) is not None
+            finally:
+                engine.pass_turn()
+        return True
+
+
+    def attacking_moves(self, attacker, bee_neighbors):
+        """Yield the attacker's piece moves that fill an empty cell next to the defender's Bee."""
+        engine = self.ai.engine
+        board_state = engine.boardState
+        for origin in self.ai.get_movable_pieces(attacker):
+            # A single piece leaving a Bee neighbor frees a cell as it fills another
+            leaves_neighbor = origin in bee_neighbors and board_state.get_stack_height(*origin) == 1
+            if leaves_neighbor:
+                continue
+            for destination in engine.get_piece_moves(*origin):
+                if destination in bee_neighbors and not board_state.is_cell_occupied(*destination):
+                    yield origin, destination
+
+
+    def is_win(self, attacker, defender):
+        """Check if the defender's Bee is surrounded and the attacker's is not."""
+        engine = self.ai.engine
+        return engine.check_bee_surrounded(defender) and not engine.check_bee_surrounded(attacker)
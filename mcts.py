@@ -0,0 +1,238 @@
+import math
+import random
+import time
+
+from engine import HiveGame
+from hiveAI import HiveAI
+
+# Rollouts stop after this many plies and are scored by HiveAI.evaluate_board
+ROLLOUT_DEPTH = 12
+# evaluate_board scores are squashed into a Player 1 win probability with this scale
+SCORE_SCALE = 1000
+
+
+class MCTSNode:
+    """A position in the search tree, reached by `move` from its parent."""
+
+    def __init__(self, move, parent, player, key):
+        self.move = move  # None for the root and for a pass
+        self.parent = parent
+        self.player = player  # The player to move in this position
+        self.key = key  # Zobrist key of the position, used to find it again on the next call
+        self.children = []
+        self.untried_moves = None  # Generated on the first visit
+        self.visits = 0
+        self.wins = 0.0  # Summed rewards for the player who moved into this node
+
+
+    def uct_child(self, exploration):
+        """Select the child with the best UCT score."""
+        log_visits = math.log(self.visits)
+        return max(
+            self.children,
+            key=lambda child: child.wins / child.visits + exploration * math.sqrt(log_visits / child.visits),
+        )
+
+
+class HiveMCTS:
+    """
+    Monte Carlo Tree Search (UCT) engine with the same HiveGame interface as HiveAI.
+    Playouts use a cheap random policy that prefers moves next to the opponent's Bee and are cut
+    after ROLLOUT_DEPTH plies, where the position is scored with HiveAI.evaluate_board.
+    The tree is kept between calls, so the subtree of the position actually reached is reused.
+    """
+
+    def __init__(self, engine: HiveGame, exploration=1.4, playouts_per_second=None, seed=None):
+        """
+        Args:
+            engine: The game to search, moves are made and undone on it in place.
+            exploration: UCT exploration constant.
+            playouts_per_second: Caps the playouts of a search at this rate times the time limit, None for no cap.
+            seed: Seed of the rollout policy.
+        """
+        self.engine = engine
+        self.exploration = exploration
+        self.playouts_per_second = playouts_per_second
+        self.rng = random.Random(seed)
+        # Move generation and evaluation are shared with the alpha-beta engine
+        self.helper = HiveAI(engine, tt_size_mb=1)
+        self.root = None
+        self.playouts = 0
+        self.stop_flag = None  # Like HiveAI.stop_flag, the search ends once stop_flag.value is set
+        self.search_start_time = None
+
+
+    def iterative_deepening(self, is_maximizing_player, max_depth, time_limit):
+        """Drop-in for HiveAI.iterative_deepening; max_depth is not used, MCTS runs until time_limit."""
+        return self.search(is_maximizing_player, time_limit)
+
+
+    def search(self, is_maximizing_player, time_limit):
+        """
+        Run playouts from the current position until the time limit (or the playout cap) is reached.
+        Returns:
+            The most visited root move, or None if the player has to pass.
+        """
+        start_time = time.time()
+        player = "Player 1" if is_maximizing_player else "Player 2"
+        max_playouts = None
+        if self.playouts_per_second is not None:
+            max_playouts = max(1, int(self.playouts_per_second * time_limit))
+
+        self.root = self.find_subtree(self.engine.zobrist_key, player)
+        self.playouts = 0
+        self.search_start_time = start_time
+        while time.time() - start_time < time_limit and (max_playouts is None or self.playouts < max_playouts):
+            if self.stop_flag is not None and self.stop_flag.value:
+                break
+            self.playout()
+            self.playouts += 1
+            if self.root.untried_moves == [] and len(self.root.children) <= 1:
+                break  # Only one move (or a pass), nothing to compare
+
+        if not self.root.children:
+            return None
+        return max(self.root.children, key=lambda child: child.visits).move
+
+
+    def get_progress(self):
+        """
+        Get the progress of the running (or last) search like HiveAI.get_progress, counting playouts as nodes.
+        Returns:
+            (None, most visited root move, playouts per second)
+        """
+        if self.search_start_time is None or self.root is None or not self.root.children:
+            return None, None, 0
+        best_move = max(list(self.root.children), key=lambda child: child.visits).move
+        elapsed = max(time.time() - self.search_start_time, 1e-6)
+        return None, best_move, int(self.playouts / elapsed)
+
+
+    def find_subtree(self, key, player):
+        """Get the node of the current position from the last tree (up to two plies down), or a new root."""
+        if self.root is not None:
+            frontier = [self.root]
+            for _ in range(3):
+                for node in frontier:
+                    if node.key == key and node.player == player:
+                        node.parent = None
+                        node.move = None
+                        return node
+                frontier = [child for node in frontier for child in node.children]
+        return MCTSNode(None, None, player, key)
+
+
+    def playout(self):
+        """One MCTS iteration: selection, expansion, rollout and backpropagation."""
+        node = self.root
+        path = []  # (move, player) made on the engine, undone at the end
+
+        # Selection
+        while node.untried_moves is not None and not node.untried_moves and node.children:
+            node = node.uct_child(self.exploration)
+            self.play(node.move, node.parent.player, path)
+
+        # Expansion
+        if not self.engine.is_game_over():
+            if node.untried_moves is None:
+                node.untried_moves = self.helper.get_all_moves(node.player)
+                self.rng.shuffle(node.untried_moves)
+                if not node.untried_moves:
+                    node.untried_moves = [None]  # No legal move, the only option is to pass
+            if node.untried_moves:
+                move = node.untried_moves.pop()
+                player = node.player
+                self.play(move, player, path)
+                child = MCTSNode(move, node, self.opponent(player), self.engine.zobrist_key)
+                node.children.append(child)
+                node = child
+
+        # Rollout
+        rollout_path = []
+        player = node.player
+        for _ in range(ROLLOUT_DEPTH):
+            if self.engine.is_game_over():
+                break
+            self.play(self.rollout_move(player), player, rollout_path)
+            player = self.opponent(player)
+        reward = 1 / (1 + math.exp(-self.helper.evaluate_board() / SCORE_SCALE))  # Player 1's chance to win
+        self.undo(rollout_path)
+        self.undo(path)
+
+        # Backpropagation
+        while node is not None:
+            node.visits += 1
+            if node.parent is not None:
+                node.wins += reward if node.parent.player == "Player 1" else 1 - reward
+            node = node.parent
+
+
+    def rollout_move(self, player):
+        """
+        Pick a random move without generating every move: a piece move next to the opponent's Bee
+        if the first movable piece tried has one, otherwise a random piece move or placement.
+        Returns None if nothing was found, which is played as a pass.
+        """
+        helper = self.helper
+        opponent_index = 1 if player == "Player 1" else 0
+        bee_neighbors = ()
+        if self.engine.bee_placed[opponent_index]:
+            bee_neighbors = self.engine.boardState.get_neighbors(*self.engine.bee_coordinates[opponent_index])
+
+        def piece_move():
+            origins = helper.get_movable_pieces(player)
+            self.rng.shuffle(origins)
+            for origin in origins:
+                destinations = self.engine.get_piece_moves(*origin)
+                if destinations:
+                    attacking = [destination for destination in destinations if destination in bee_neighbors]
+                    return origin, self.rng.choice(attacking or destinations)
+            return None
+
+        def placement():
+            piece_types = helper.get_placeable_piece_types(player)
+            if not piece_types:
+                return None
+            cells = list(helper.get_placement_cells(player))
+            self.rng.shuffle(cells)
+            for row, col in cells:
+                piece_type = self.rng.choice(piece_types)
+                if self.engine.is_placement_valid(player, row, col, piece_type):
+                    return None, (row, col, piece_type)
+            return None
+
+        generators = [piece_move, placement]
+        self.rng.shuffle(generators)
+        for generator in generators:
+            move = generator()
+            if move is not None:
+                return move
+        return None
+
+
+    def play(self, move, player, path):
+        """Make a move (None passes) for a player and remember it in path."""
+        player_index = 0 if player == "Player 1" else 1
+        if move is None:
+            self.engine.pass_turn()
+        else:
+            self.engine.make_move(move, player)
+        self.engine.turn_counter[player_index] += 1
+        path.append((move, player))
+
+
+    def undo(self, path):
+        """Undo the moves in path, last first."""
+        while path:
+            move, player = path.pop()
+            player_index = 0 if player == "Player 1" else 1
+            self.engine.turn_counter[player_index] -= 1
+            if move is None:
+                self.engine.pass_turn()
+            else:
+                self.engine.undo_move(move, player)
+
+
+    @staticmethod
+    def opponent(player):
+        return "Player 2" if player == "Player 1" else "Player 1"
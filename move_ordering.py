@@ -0,0 +1,54 @@
+from engine import HiveGame
+
+KILLERS_PER_PLY = 2
+
+
+class MoveOrderer:
+    """
+    Killer moves and history scores used by HiveAI.generate_moves to order moves
+    so alpha-beta finds cut-offs early. Moves next to the opponent's Bee by the pieces
+    close to it are tried before killers, and the remaining moves are sorted by history score.
+    """
+
+    def __init__(self, engine: HiveGame):
+        self.engine = engine
+        self.killers = {}  # ply -> most recent quiet moves that caused a cut-off
+        self.history = {}  # (player, move) -> accumulated cut-off score
+
+
+    def new_search(self):
+        """Forget the killers of the last search and age the history scores."""
+        self.killers = {}
+        self.history = {key: score // 2 for key, score in self.history.items() if score > 1}
+
+
+    def is_bee_threat(self, move, player):
+        """Check if a move lands next to the opponent's Bee."""
+        opponent = "Player 2" if player == "Player 1" else "Player 1"
+        return self.engine.move_threatens_bee(move, opponent)
+
+
+    def is_quiet(self, move, player, ply):
+        """Check if a move is neither a Bee threat nor a killer, so late move reductions may apply."""
+        return move not in self.get_killers(ply) and not self.is_bee_threat(move, player)
+
+
+    def get_killers(self, ply):
+        """Get the killer moves recorded for a ply."""
+        return self.killers.get(ply, ())
+
+
+    def history_score(self, player, move):
+        """Get the history score of a move for a player."""
+        return self.history.get((player, move), 0)
+
+
+    def record_cutoff(self, move, player, ply, depth):
+        """Remember a quiet move that caused a cut-off as a killer and in the history table."""
+        if self.is_bee_threat(move, player):
+            return
+        killers = self.killers.setdefault(ply, [])
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[KILLERS_PER_PLY:]
+        self.history[(player, move)] = self.history.get((player, move), 0) + depth * depth
@@ -0,0 +1,159 @@
+import argparse
+import mmap
+import os
+import struct
+
+from bitboard import BitboardBoardState
+from engine import HiveGame
+from hiveAI import HiveAI
+from symmetry import canonicalize
+from transposition import encode_move, decode_move
+
+OPENING_BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "opening_book.bin")
+BOOK_MAGIC = b"HIVEBOOK"
+HEADER = struct.Struct("<8sQ")  # magic, number of entries
+ENTRY = struct.Struct("<QQiI")  # canonical position key, encoded move, score, search depth; sorted by key
+# Moves are stored in the canonical frame (see symmetry.py), whose coordinates can be negative;
+# they are shifted by this much to fit encode_move's 8-bit coordinates
+CELL_OFFSET = 64
+
+
+class OpeningBook:
+    """
+    Read-only opening book: a file of fixed-size entries sorted by position key,
+    memory-mapped and binary-searched so a lookup touches only a few pages.
+    Positions are keyed by their canonical form, so symmetric and translated positions share an entry.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as book_file:
+            self.data = mmap.mmap(book_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count = HEADER.unpack_from(self.data, 0)
+        if magic != BOOK_MAGIC or len(self.data) != HEADER.size + self.count * ENTRY.size:
+            self.data.close()
+            raise ValueError(f"{path} is not an opening book")
+
+
+    def lookup(self, key):
+        """
+        Get the book entry of a canonical position key.
+        Returns:
+            (move, score, depth) with the move in the canonical frame, or None if the position is not in the book.
+        """
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            entry_key, move, score, depth = ENTRY.unpack_from(self.data, HEADER.size + middle * ENTRY.size)
+            if entry_key == key:
+                return shift_move(decode_move(move), -CELL_OFFSET), score, depth
+            if entry_key < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+
+    def get_move(self, engine, player):
+        """Get the book move of the player to move in a game, or None if the position is not in the book."""
+        key, transform = canonicalize(engine.boardState, engine.player_pieces, player)
+        entry = self.lookup(key)
+        if entry is None:
+            return None
+        return transform.move_from_canonical(entry[0])
+
+
+    def close(self):
+        self.data.close()
+
+
+def shift_move(move, offset):
+    """Add an offset to every coordinate of a move."""
+    origin, destination = move
+    if origin is None:
+        return None, (destination[0] + offset, destination[1] + offset, destination[2])
+    return (origin[0] + offset, origin[1] + offset), (destination[0] + offset, destination[1] + offset)
+
+
+def open_opening_book(path=OPENING_BOOK_PATH):
+    """Open the opening book at path, or return None if there is none."""
+    if not os.path.exists(path):
+        return None
+    return OpeningBook(path)
+
+
+def write_opening_book(path, entries):
+    """
+    Write an opening book file.
+    Args:
+        path: The file to write.
+        entries: Dict of canonical position key -> (move in the canonical frame, score, depth).
+    """
+    with open(path, "wb") as book_file:
+        book_file.write(HEADER.pack(BOOK_MAGIC, len(entries)))
+        for key in sorted(entries):
+            move, score, depth = entries[key]
+            book_file.write(ENTRY.pack(key, encode_move(shift_move(move, CELL_OFFSET)), score, depth))
+
+
+def build_opening_book(path=OPENING_BOOK_PATH, board_size=20, plies=3, max_depth=4, time_limit=10, progress=None):
+    """
+    Build an opening book offline: every position reachable in the first `plies` plies is searched
+    with iterative deepening and its best move is stored. Symmetric positions are searched once.
+    Args:
+        path: The book file to write.
+        board_size: Board size of the games the book is used in.
+        plies: How many plies from the start are covered.
+        max_depth, time_limit: Search limits per position.
+        progress: Called as progress(positions, ply, best_move, score, depth) after every searched position, or None.
+    Returns:
+        The number of positions in the book.
+    """
+    engine = HiveGame(board_size, board_backend=BitboardBoardState)
+    ai = HiveAI(engine)
+    entries = {}
+
+    def expand(player, ply):
+        key, transform = canonicalize(engine.boardState, engine.player_pieces, player)
+        if ply >= plies or key in entries or engine.is_game_over():
+            return
+        is_maximizing_player = player == "Player 1"
+        best_move = ai.iterative_deepening(is_maximizing_player, max_depth, time_limit)
+        if best_move is None:
+            return
+        score = ai.best_score if abs(ai.best_score) < float('inf') else 0
+        entries[key] = (transform.move_to_canonical(best_move), int(score), ai.completed_depth)
+        if progress is not None:
+            progress(len(entries), ply, best_move, score, ai.completed_depth)
+
+        # Cover every reply so the book still answers when the other side leaves it
+        opponent = "Player 2" if is_maximizing_player else "Player 1"
+        player_index = 0 if is_maximizing_player else 1
+        for move in ai.get_all_moves(player):
+            engine.make_move(move, player)
+            engine.turn_counter[player_index] += 1
+            try:
+                expand(opponent, ply + 1)
+            finally:
+                engine.turn_counter[player_index] -= 1
+                engine.undo_move(move, player)
+
+    expand("Player 1", 0)
+    write_opening_book(path, entries)
+    return len(entries)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the opening book from deep searches.")
+    parser.add_argument("--output", default=OPENING_BOOK_PATH)
+    parser.add_argument("--plies", type=int, default=3)
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--time", type=float, default=10)
+    args = parser.parse_args()
+
+    def print_progress(positions, ply, best_move, score, depth):
+        print(f"{positions} positions, ply {ply}: {best_move} ({score}, depth {depth})")
+
+    count = build_opening_book(args.output, plies=args.plies, max_depth=args.depth, time_limit=args.time,
+                               progress=print_progress)
+    print(f"Wrote {count} positions to {args.output}")
@@ -0,0 +1,99 @@
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def get_gate_table(board_size):
+    """Get the shared (cell, neighbor) -> common neighbors table for a board size, filled lazily."""
+    return {}
+
+
+class PerimeterGraph:
+    """
+    Slide graph of the empty cells around the hive for one position, shared by every
+    sliding piece (Bee, Ant, Spider) until the board changes.
+
+    A piece may slide from an empty cell to a neighboring empty cell when exactly one of
+    the two cells both share as neighbors is occupied: with both occupied the gap is too
+    narrow (freedom to move), with neither the piece would lose contact with the hive.
+    Queries take the moving piece's origin, which is treated as empty.
+    """
+
+    def __init__(self, board_state):
+        self.board_state = board_state
+        self._slides = {}  # cell -> slide targets with nothing excluded
+        self._ant_destinations = {}  # origin -> cells an Ant starting there can reach
+        self._gates = get_gate_table(board_state.board_size)  # (cell, neighbor) -> the cells adjacent to both
+
+
+    def _is_occupied(self, cell, origin):
+        """Check if a cell is occupied once the moving piece has left its origin."""
+        return cell != origin and self.board_state.board[cell[0]][cell[1]] is not None
+
+
+    def _get_gate(self, cell, neighbor):
+        """Get the (at most two) cells adjacent to both a cell and its neighbor."""
+        gate = self._gates.get((cell, neighbor))
+        if gate is None:
+            neighbor_cells = self.board_state.get_neighbors(*neighbor)
+            gate = tuple(n for n in self.board_state.get_neighbors(*cell) if n in neighbor_cells)
+            self._gates[(cell, neighbor)] = gate
+        return gate
+
+
+    def _compute_slides(self, cell, origin):
+        """Get the empty neighbors a piece on `cell` can slide to."""
+        targets = []
+        for neighbor in self.board_state.get_neighbors(*cell):
+            if self._is_occupied(neighbor, origin):
+                continue
+            occupied_sides = 0
+            for side in self._get_gate(cell, neighbor):
+                if self._is_occupied(side, origin):
+                    occupied_sides += 1
+            if occupied_sides == 1:
+                targets.append(neighbor)
+        return targets
+
+
+    def get_slides(self, cell, origin=None):
+        """
+        Get the cells a piece can slide to from `cell` while the piece from `origin` is lifted.
+        Only cells next to the origin see a different hive, everything else comes from the cache.
+        """
+        if origin is not None and (cell == origin or origin in self.board_state.get_neighbors(*cell)):
+            return self._compute_slides(cell, origin)
+        slides = self._slides.get(cell)
+        if slides is None:
+            slides = self._compute_slides(cell, None)
+            self._slides[cell] = slides
+        return slides
+
+
+    def get_ant_destinations(self, origin):
+        """Get every cell reachable by sliding from the origin (one flood fill per origin)."""
+        destinations = self._ant_destinations.get(origin)
+        if destinations is None:
+            reached = {origin}
+            stack = [origin]
+            while stack:
+                for neighbor in self.get_slides(stack.pop(), origin):
+                    if neighbor not in reached:
+                        reached.add(neighbor)
+                        stack.append(neighbor)
+            reached.discard(origin)
+            destinations = list(reached)
+            self._ant_destinations[origin] = destinations
+        return destinations
+
+
+    def get_spider_destinations(self, origin):
+        """Get every cell reachable by exactly three slides without visiting a cell twice."""
+        destinations = set()
+        for first in self.get_slides(origin, origin):
+            for second in self.get_slides(first, origin):
+                if second == origin:
+                    continue
+                for third in self.get_slides(second, origin):
+                    if third != origin and third != first:
+                        destinations.add(third)
+        return list(destinations)
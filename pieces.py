@@ -1,49 +1,21 @@
 class Pieces:
     @staticmethod
     def get_bee_moves(boardState, row, col):
-        """Bee moves to any unoccupied neighboring cell while keeping the hive intact."""
-        valid_moves = []
-        for neighbor in boardState.get_neighbors(row, col):
-            if not boardState.is_cell_occupied(*neighbor) and boardState.is_hive_intact_after_move((row, col), neighbor):
-                valid_moves.append(neighbor)
-        return valid_moves
+        """Bee slides one space around the hive."""
+        return list(boardState.get_perimeter_graph().get_slides((row, col), (row, col)))
 
 
     @staticmethod
     def get_ant_moves(boardState, row, col):
-        """Ant can move to any unoccupied cell while keeping the hive intact."""
-        visited = set()
-        stack = [(row, col)]  # Start from the Ant's position
-        valid_moves = []
-
-        while stack:
-            current = stack.pop()
-            for neighbor in boardState.get_neighbors(*current):
-                if neighbor not in visited and not boardState.is_cell_occupied(*neighbor):
-                    visited.add(neighbor)
-                    if boardState.is_hive_intact_after_move((row, col), neighbor):
-                        valid_moves.append(neighbor)
-                    stack.append(neighbor)  # Keep exploring
-        return valid_moves
+        """Ant can slide any number of spaces around the hive."""
+        # Sliding keeps contact with the hive, so no per-destination hive check is needed
+        return list(boardState.get_perimeter_graph().get_ant_destinations((row, col)))
 
 
     @staticmethod
     def get_spider_moves(boardState, row, col):
-        """Spider moves exactly 3 spaces, no revisits, keeping the hive intact."""
-        valid_moves = set()  # Use a set to prevent duplicate moves
-
-        def dfs(current, path):
-            if len(path) == 4:  # Exactly 3 moves (path includes starting cell)
-                # Check hive integrity only for the final position
-                if boardState.is_hive_intact_after_move((row, col), path[-1]):
-                        valid_moves.add(path[-1])  # Add the final position to the set
-                return
-            for neighbor in boardState.get_neighbors(*current):
-                if neighbor not in path and not boardState.is_cell_occupied(*neighbor):  # Valid move
-                    dfs(neighbor, path + [neighbor])
-
-        dfs((row, col), [(row, col)])
-        return list(valid_moves)  # Convert the set to a list before returning
+        """Spider slides exactly 3 spaces around the hive, no revisits."""
+        return boardState.get_perimeter_graph().get_spider_destinations((row, col))
 
 
     @staticmethod
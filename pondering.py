@@ -0,0 +1,110 @@
+import multiprocessing
+import pickle
+import threading
+import time
+
+from hiveAI import HiveAI, MATE_TIME_FRACTION
+
+# Pondering searches run until they are stopped or reach their maximum depth
+PONDER_TIME_LIMIT = 3600
+
+
+class Ponderer:
+    """
+    Searches on the opponent's time: while the human thinks, a background thread plays the predicted
+    reply (the hash move of the current position) on a copy of the game and searches the position after it.
+    The pondering search shares the AI's transposition table, so even a wrong prediction leaves useful entries.
+    """
+
+    def __init__(self, ai: HiveAI):
+        """
+        Args:
+            ai: The AI whose next move is pondered; it must not search while the ponderer runs.
+        """
+        self.ai = ai
+        self.thread = None
+        # Same stop mechanism as the Lazy SMP helpers, read by HiveAI.check_deadline
+        self.stop_flag = multiprocessing.RawValue('b', False)
+        self.predicted_key = None  # Zobrist key of the position searched, after the predicted reply
+        self.predicted_turns = None
+        self.result = None  # (best move, completed depth, seconds searched) once the search ended
+        self.start_time = None
+
+
+    def start(self, engine, player, max_depth, time_limit):
+        """
+        Start pondering the position after the predicted move of `player`, the side to move now.
+        Args:
+            engine: The game, only copied.
+            player: The player about to move (the human).
+            max_depth, time_limit: The search limits the AI will be given on its turn.
+        """
+        self.stop()
+        self.predicted_key = None
+        self.result = None
+        game = pickle.loads(pickle.dumps(engine))
+        ponder_ai = HiveAI(game, tt_size_mb=1, search_mode="pvs" if self.ai.search_mode == "pvs" else "serial",
+                           mobility_mode=self.ai.mobility_mode, opening_book=self.ai.opening_book, mate_plies=self.ai.mate_plies)
+        ponder_ai.transposition_table = self.ai.transposition_table
+        ponder_ai.stop_flag = self.stop_flag
+        # The mate solver gets the budget of a normal search, not a share of PONDER_TIME_LIMIT
+        ponder_ai.mate_time_limit = time_limit * MATE_TIME_FRACTION
+
+        entry = ponder_ai.transposition_table.probe(game.zobrist_key)
+        predicted_move = entry[4] if entry is not None else None
+        # A key collision can leave the hash move of another position
+        if predicted_move is not None and not ponder_ai.is_legal_move(player, predicted_move):
+            predicted_move = None
+        if predicted_move is None:
+            predicted_move = next(ponder_ai.generate_moves(player), None)
+        if predicted_move is None:
+            return
+        game.make_move(predicted_move, player)
+        game.turn_counter[0 if player == "Player 1" else 1] += 1
+        if game.is_game_over():
+            return
+
+        self.predicted_key = game.zobrist_key
+        self.predicted_turns = list(game.turn_counter)
+        self.start_time = time.time()
+        is_maximizing_player = player == "Player 2"  # The AI replies to the predicted move
+
+        def ponder():
+            move = ponder_ai.iterative_deepening(is_maximizing_player, max_depth, PONDER_TIME_LIMIT)
+            self.result = (move, ponder_ai.completed_depth, time.time() - self.start_time)
+
+        self.thread = threading.Thread(target=ponder, name="ponder", daemon=True)
+        self.thread.start()
+
+
+    def stop(self):
+        """Stop the pondering search, if any, and wait for it."""
+        if self.thread is not None:
+            self.stop_flag.value = True
+            self.thread.join()
+            self.thread = None
+            self.stop_flag.value = False
+
+
+    def iterative_deepening(self, is_maximizing_player, max_depth, time_limit):
+        """
+        Drop-in for HiveAI.iterative_deepening that stops pondering first. If the prediction was right, the
+        pondered move is played when it completed a depth and searched as long or as deep as asked,
+        otherwise the AI continues for the time that is left, starting from the filled transposition table.
+        """
+        self.stop()
+        engine = self.ai.engine
+        hit = self.result is not None and engine.zobrist_key == self.predicted_key and list(engine.turn_counter) == self.predicted_turns
+        self.predicted_key = None
+        if hit:
+            move, completed_depth, elapsed = self.result
+            # Without a completed depth the move comes from a depth 1 search cut off partway, so it is not trusted
+            if move is not None and completed_depth >= 1 and (completed_depth >= max_depth or elapsed >= time_limit):
+                return move
+            time_limit = max(time_limit - elapsed, 0.1 * time_limit)
+        return self.ai.iterative_deepening(is_maximizing_player, max_depth, time_limit)
+
+
+    def get_progress(self):
+        """Get the progress of the AI's search, see HiveAI.get_progress."""
+        return self.ai.get_progress()
@@ -0,0 +1,189 @@
+import argparse
+import json
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from bitboard import BitboardBoardState
+from engine import HiveGame
+from hiveAI import HiveAI, DIFFICULTIES
+from mcts import HiveMCTS
+
+BOARD_SIZE = 20
+# Games still running after this many plies are draws
+MAX_PLIES = 300
+# Config keys used by the runner, and the keys passed on to each engine. HiveMCTS ignores the HiveAI
+# settings, so one config can be tried with both engines.
+SEARCH_KEYS = ("engine", "max_depth", "time_limit")
+HIVEAI_KEYS = ("tt_size_mb", "mobility_mode", "search_mode", "workers", "mate_plies")
+MCTS_KEYS = ("exploration", "playouts_per_second")
+
+
+def parse_config(spec):
+    """Get an engine config from a difficulty name (see DIFFICULTIES) or a JSON object of settings."""
+    if spec in DIFFICULTIES:
+        return dict(DIFFICULTIES[spec])
+    config = json.loads(spec)
+    if not isinstance(config, dict) or "time_limit" not in config:
+        raise ValueError(f"{spec!r} is neither a difficulty nor a JSON config with a time_limit")
+    unknown = set(config) - set(SEARCH_KEYS + HIVEAI_KEYS + MCTS_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown config keys {sorted(unknown)}, expected some of {list(SEARCH_KEYS + HIVEAI_KEYS + MCTS_KEYS)}")
+    config.setdefault("engine", "minimax")
+    config.setdefault("max_depth", 50)
+    return config
+
+
+def create_engine(config, game, seed=None):
+    """Create the HiveAI (or HiveMCTS) of a config, playing on game."""
+    if config["engine"] == "mcts":
+        options = {key: value for key, value in config.items() if key in MCTS_KEYS}
+        return HiveMCTS(game, seed=seed, **options)
+    options = {key: value for key, value in config.items() if key in HIVEAI_KEYS}
+    options.setdefault("workers", 1)  # The games already run in parallel
+    return HiveAI(game, **options)
+
+
+def random_opening(plies, seed, board_size=BOARD_SIZE):
+    """Get `plies` random legal moves from the start (fewer if the game ends), to vary the games."""
+    game = HiveGame(board_size, board_backend=BitboardBoardState)
+    ai = HiveAI(game, tt_size_mb=1)
+    rng = random.Random(seed)
+    moves = []
+    player = "Player 1"
+    for _ in range(plies):
+        legal_moves = ai.get_all_moves(player)
+        if not legal_moves:
+            break
+        move = rng.choice(legal_moves)
+        game.make_move(move, player)
+        game.turn_counter[0 if player == "Player 1" else 1] += 1
+        moves.append(move)
+        if game.is_game_over():
+            break
+        player = "Player 2" if player == "Player 1" else "Player 1"
+    return moves
+
+
+def play_game(configs, opening=(), board_size=BOARD_SIZE, max_plies=MAX_PLIES, seed=None):
+    """
+    Play one game between two engine configs, without a GUI.
+    Args:
+        configs: (Player 1 config, Player 2 config).
+        opening: Moves played before the engines take over.
+        max_plies: Plies (including the opening) after which the game is a draw.
+        seed: Seed of the MCTS engines.
+    Returns:
+        Dict with the result ("Player 1", "Player 2" or "draw"), the number of plies and, for each engine move,
+        the seconds and nodes (playouts for MCTS) it took.
+    """
+    game = HiveGame(board_size, board_backend=BitboardBoardState)
+    engines = [create_engine(config, game, seed) for config in configs]
+    player = "Player 1"
+    plies = 0
+    move_times, nodes = [], []
+    try:
+        for move in opening:
+            game.make_move(move, player)
+            game.turn_counter[0 if player == "Player 1" else 1] += 1
+            plies += 1
+            player = "Player 2" if player == "Player 1" else "Player 1"
+
+        while not game.is_game_over() and plies < max_plies:
+            player_index = 0 if player == "Player 1" else 1
+            config = configs[player_index]
+            engine = engines[player_index]
+            start_time = time.time()
+            move = engine.iterative_deepening(player == "Player 1", config["max_depth"], config["time_limit"])
+            move_times.append(round(time.time() - start_time, 3))
+            nodes.append(engine.playouts if isinstance(engine, HiveMCTS) else engine.nodes)
+            if move is None:
+                game.pass_turn()
+            else:
+                game.make_move(move, player)
+            game.turn_counter[player_index] += 1
+            plies += 1
+            player = "Player 2" if player == "Player 1" else "Player 1"
+    finally:
+        for engine in engines:
+            if isinstance(engine, HiveAI):
+                engine.close()
+
+    player_1_lost = game.check_bee_surrounded("Player 1")
+    player_2_lost = game.check_bee_surrounded("Player 2")
+    if player_1_lost == player_2_lost:
+        result = "draw"  # Both Bees surrounded at once, or out of plies
+    else:
+        result = "Player 2" if player_1_lost else "Player 1"
+    return {"result": result, "plies": plies, "move_times": move_times, "nodes": nodes}
+
+
+def play_pairing(game_index, labels, configs, opening, board_size, max_plies):
+    """Worker task: play one game and label the record with the game index and who played which side."""
+    record = play_game(configs, opening, board_size, max_plies, seed=game_index)
+    winner = {"Player 1": labels[0], "Player 2": labels[1]}.get(record["result"])
+    return {"game": game_index, "player_1": labels[0], "player_2": labels[1], "winner": winner, **record}
+
+
+def play_match(configs, games, workers=None, openings=None, board_size=BOARD_SIZE, max_plies=MAX_PLIES):
+    """
+    Play games between two configs in a process pool, swapping sides after every game so each pair of
+    games starts from the same opening.
+    Args:
+        configs: Dict of label -> config, with two entries.
+        games: Number of games.
+        workers: Number of worker processes (one per CPU by default).
+        openings: Move lists cycled through by the game pairs, or None to start from the empty board.
+    Yields:
+        The record of each game as it finishes, see play_game and play_pairing.
+    """
+    labels = list(configs)
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = []
+        for game_index in range(games):
+            pair_labels = labels if game_index % 2 == 0 else labels[::-1]
+            opening = openings[game_index // 2 % len(openings)] if openings else ()
+            futures.append(pool.submit(play_pairing, game_index, pair_labels,
+                                       [configs[label] for label in pair_labels], opening, board_size, max_plies))
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        # Also reached when the caller stops early, the games nobody started are dropped
+        pool.shutdown(cancel_futures=True)
+
+
+def run_match(configs, games, output, workers=None, opening_plies=0, board_size=BOARD_SIZE, max_plies=MAX_PLIES):
+    """
+    Play a match and stream the game records to a JSONL file.
+    Args:
+        opening_plies: Random opening moves played before every game pair (0 for none).
+    Returns:
+        Dict of label (or "draw") -> number of games won.
+    """
+    openings = None
+    if opening_plies > 0:
+        openings = [random_opening(opening_plies, seed, board_size) for seed in range((games + 1) // 2)]
+    score = {label: 0 for label in configs}
+    score["draw"] = 0
+    with open(output, "a") as output_file:
+        for record in play_match(configs, games, workers, openings, board_size, max_plies):
+            output_file.write(json.dumps(record) + "\n")
+            output_file.flush()
+            score[record["winner"] or "draw"] += 1
+            print(f"game {record['game']}: {record['winner'] or 'draw'} in {record['plies']} plies | {score}")
+    return score
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play headless games between two engine configs.")
+    parser.add_argument("--player1", default="easy", help="Difficulty name or JSON config of the first engine")
+    parser.add_argument("--player2", default="medium", help="Difficulty name or JSON config of the second engine")
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--opening-plies", type=int, default=0)
+    parser.add_argument("--max-plies", type=int, default=MAX_PLIES)
+    parser.add_argument("--output", default="selfplay.jsonl")
+    args = parser.parse_args()
+    match_configs = {"player1": parse_config(args.player1), "player2": parse_config(args.player2)}
+    run_match(match_configs, args.games, args.output, args.workers, args.opening_plies, max_plies=args.max_plies)
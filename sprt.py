@@ -0,0 +1,113 @@
+import argparse
+import json
+import math
+
+from selfplay import BOARD_SIZE, MAX_PLIES, parse_config, play_match, random_opening
+
+# Fixed opening positions: random openings of OPENING_PLIES plies from seeds 0 to OPENING_COUNT - 1,
+# so every test plays the same set
+OPENING_COUNT = 50
+OPENING_PLIES = 4
+
+
+def elo_to_score(elo):
+    """Expected score of a player that is `elo` Elo stronger than its opponent."""
+    return 1 / (1 + 10 ** (-elo / 400))
+
+
+def score_to_elo(score):
+    """Elo difference matching an average score (clamped away from 0 and 1)."""
+    score = min(max(score, 1e-3), 1 - 1e-3)
+    return -400 * math.log10(1 / score - 1)
+
+
+def log_likelihood_ratio(pair_scores, elo0, elo1):
+    """
+    Log-likelihood ratio of "the candidate is elo1 stronger" against "it is elo0 stronger", using the normal
+    approximation of the pair scores (generalized SPRT). Scoring game pairs instead of single games takes
+    out the advantage of the opening and of moving first.
+    Args:
+        pair_scores: The candidate's average score of each game pair (0, 0.25, 0.5, 0.75 or 1).
+    """
+    count = len(pair_scores)
+    if count < 2:
+        return 0.0
+    mean = sum(pair_scores) / count
+    variance = sum((score - mean) ** 2 for score in pair_scores) / count
+    if variance == 0:
+        return 0.0
+    score0, score1 = elo_to_score(elo0), elo_to_score(elo1)
+    return count * (score1 - score0) * (2 * mean - score0 - score1) / (2 * variance)
+
+
+def run_sprt(baseline, candidate, elo0=0, elo1=10, alpha=0.05, beta=0.05, max_pairs=1000, workers=None,
+             output=None, board_size=BOARD_SIZE, max_plies=MAX_PLIES):
+    """
+    Sequential probability ratio test of a candidate engine config against a baseline. Game pairs are played
+    from the fixed openings with the sides swapped, until the log-likelihood ratio crosses a bound.
+    Args:
+        baseline, candidate: Engine configs (see selfplay.parse_config), normally with the same time_limit.
+        elo0, elo1: Elo difference of the null hypothesis (H0) and of the alternative one (H1).
+        alpha, beta: Chances of accepting H1 when H0 holds and of accepting H0 when H1 holds.
+        max_pairs: Game pairs after which the test stops without a verdict.
+        output: JSONL file the game records are appended to, or None.
+    Returns:
+        ("H1" (the candidate is stronger), "H0" or None, final log-likelihood ratio, number of pairs played).
+    """
+    lower_bound, upper_bound = math.log(beta / (1 - alpha)), math.log((1 - beta) / alpha)
+    openings = [random_opening(OPENING_PLIES, seed, board_size) for seed in range(OPENING_COUNT)]
+    configs = {"baseline": baseline, "candidate": candidate}
+    first_scores = {}  # Pair index -> candidate score of the pair game that finished first
+    pair_scores = []
+    verdict, llr = None, 0.0
+    output_file = open(output, "a") if output is not None else None
+    records = play_match(configs, 2 * max_pairs, workers, openings, board_size, max_plies)
+    try:
+        for record in records:
+            if output_file is not None:
+                output_file.write(json.dumps(record) + "\n")
+                output_file.flush()
+            score = 0.5 if record["winner"] is None else float(record["winner"] == "candidate")
+            pair = record["game"] // 2
+            if pair not in first_scores:
+                first_scores[pair] = score
+                continue
+            pair_scores.append((first_scores.pop(pair) + score) / 2)
+
+            llr = log_likelihood_ratio(pair_scores, elo0, elo1)
+            elo = score_to_elo(sum(pair_scores) / len(pair_scores))
+            print(f"{len(pair_scores)} pairs | Elo {elo:+.1f} | LLR {llr:.2f} ({lower_bound:.2f}, {upper_bound:.2f})")
+            if llr >= upper_bound:
+                verdict = "H1"
+                break
+            if llr <= lower_bound:
+                verdict = "H0"
+                break
+    finally:
+        records.close()  # Stops the pool, dropping the games that were not started
+        if output_file is not None:
+            output_file.close()
+    return verdict, llr, len(pair_scores)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SPRT of a candidate engine config against a baseline.")
+    parser.add_argument("--baseline", default="medium", help="Difficulty name or JSON config")
+    parser.add_argument("--candidate", required=True, help="Difficulty name or JSON config")
+    parser.add_argument("--time-limit", type=float, default=None, help="Time per move of both engines")
+    parser.add_argument("--elo0", type=float, default=0)
+    parser.add_argument("--elo1", type=float, default=10)
+    parser.add_argument("--alpha", type=float, default=0.05)
+    parser.add_argument("--beta", type=float, default=0.05)
+    parser.add_argument("--max-pairs", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-plies", type=int, default=MAX_PLIES)
+    parser.add_argument("--output", default="sprt.jsonl")
+    args = parser.parse_args()
+    baseline_config, candidate_config = parse_config(args.baseline), parse_config(args.candidate)
+    if args.time_limit is not None:
+        baseline_config["time_limit"] = candidate_config["time_limit"] = args.time_limit
+    result, final_llr, pairs = run_sprt(baseline_config, candidate_config, args.elo0, args.elo1, args.alpha, args.beta,
+                                        args.max_pairs, args.workers, args.output, max_plies=args.max_plies)
+    verdict_text = {"H1": "candidate is stronger", "H0": "candidate is not stronger", None: "no verdict"}[result]
+    print(f"{verdict_text} after {pairs} pairs (LLR {final_llr:.2f})")
@@ -0,0 +1,113 @@
+import hashlib
+import struct
+
+from board import PIECE_TYPES
+
+# The hex grid has 12 symmetries: 6 rotations, each with and without a reflection
+SYMMETRIES = tuple((rotation, reflected) for reflected in (False, True) for rotation in range(6))
+
+
+def offset_to_axial(row, col):
+    """Convert a board cell (odd columns shifted down) to axial (q, r) coordinates."""
+    return col, row - (col - (col & 1)) // 2
+
+
+def axial_to_offset(q, r):
+    """Convert axial (q, r) coordinates back to a board cell (row, col)."""
+    return r + (q - (q & 1)) // 2, q
+
+
+def apply_symmetry(q, r, rotation, reflected):
+    """Reflect (optionally) and then rotate an axial cell by rotation * 60 degrees around the origin."""
+    if reflected:
+        q, r = q, -q - r
+    for _ in range(rotation):
+        q, r = -r, q + r
+    return q, r
+
+
+def invert_symmetry(q, r, rotation, reflected):
+    """Undo apply_symmetry."""
+    for _ in range(rotation):
+        q, r = q + r, -q
+    if reflected:
+        q, r = q, -q - r
+    return q, r
+
+
+class SymmetryTransform:
+    """
+    Maps board cells of a position into its canonical frame (a symmetry followed by a translation,
+    in axial coordinates) and back, so moves can be shared between symmetric positions.
+    """
+
+    def __init__(self, rotation, reflected, dq, dr):
+        self.rotation = rotation
+        self.reflected = reflected
+        self.dq = dq
+        self.dr = dr
+
+
+    def to_canonical(self, row, col):
+        """Map a board cell to canonical axial coordinates."""
+        q, r = apply_symmetry(*offset_to_axial(row, col), self.rotation, self.reflected)
+        return q - self.dq, r - self.dr
+
+
+    def from_canonical(self, q, r):
+        """Map canonical axial coordinates back to a board cell."""
+        return axial_to_offset(*invert_symmetry(q + self.dq, r + self.dr, self.rotation, self.reflected))
+
+
+    def move_to_canonical(self, move):
+        """Map a move ((row, col) or None, destination) into the canonical frame."""
+        origin, destination = move
+        if origin is None:
+            return None, (*self.to_canonical(destination[0], destination[1]), destination[2])
+        return self.to_canonical(*origin), self.to_canonical(*destination)
+
+
+    def move_from_canonical(self, move):
+        """Map a move in the canonical frame back to board cells."""
+        origin, destination = move
+        if origin is None:
+            return None, (*self.from_canonical(destination[0], destination[1]), destination[2])
+        return self.from_canonical(*origin), self.from_canonical(*destination)
+
+
+def canonicalize(board_state, player_pieces, player_to_move):
+    """
+    Get the canonical form of a position: for each of the 12 symmetries the hive is translated so its
+    bounding box starts at (0, 0), and the smallest resulting encoding is kept. Symmetric and translated
+    copies of a position get the same key.
+    Returns:
+        (key, transform): a stable 64-bit key of the canonical position and the SymmetryTransform into it.
+    """
+    cells = []
+    occupied = {(row, col) for pieces in board_state.pieces_on_board for row, col, _ in pieces}
+    for row, col in occupied:
+        cell_content = board_state.board[row][col]
+        stack = cell_content if isinstance(cell_content, list) else [cell_content]
+        cells.append((offset_to_axial(row, col), tuple((0 if player == "Player 1" else 1, PIECE_TYPES.index(piece_type))
+                                                      for player, piece_type in stack)))
+
+    best_encoding, best_transform = None, SymmetryTransform(0, False, 0, 0)
+    for rotation, reflected in SYMMETRIES:
+        moved = [(apply_symmetry(q, r, rotation, reflected), stack) for (q, r), stack in cells]
+        dq = min((q for (q, _), _ in moved), default=0)
+        dr = min((r for (_, r), _ in moved), default=0)
+        encoding = sorted((q - dq, r - dr, stack) for (q, r), stack in moved)
+        if best_encoding is None or encoding < best_encoding:
+            best_encoding, best_transform = encoding, SymmetryTransform(rotation, reflected, dq, dr)
+
+    # Hash a compact byte string so keys are the same in every process (unlike hash())
+    data = bytearray()
+    for q, r, stack in best_encoding:
+        data += struct.pack("<hhB", q, r, len(stack))
+        for player_index, type_index in stack:
+            data.append(player_index << 4 | type_index)
+    for player in ("Player 1", "Player 2"):
+        data += bytes(player_pieces[player][piece_type] for piece_type in PIECE_TYPES)
+    data.append(0 if player_to_move == "Player 1" else 1)
+    key = int.from_bytes(hashlib.blake2b(bytes(data), digest_size=8).digest(), "little")
+    return key, best_transform
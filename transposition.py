@@ -0,0 +1,173 @@
+from multiprocessing import shared_memory
+
+from board import PIECE_TYPES
+
+EXACT = 0
+LOWER_BOUND = 1  # The search failed high, the real score is at least `score`
+UPPER_BOUND = 2  # The search failed low, the real score is at most `score`
+
+
+class TranspositionTable:
+    """
+    Fixed-size transposition table indexed by the low bits of the Zobrist key.
+    Each slot holds one entry (key, depth, bound, score, best_move, generation).
+    """
+
+    # Rough size of one stored entry in CPython: the slot, the tuple and the objects it references
+    ENTRY_SIZE_BYTES = 256
+
+    def __init__(self, max_megabytes=16):
+        # Round the slot count down to a power of two so indexing is a bit mask
+        max_entries = max(1, (max_megabytes * 1024 * 1024) // self.ENTRY_SIZE_BYTES)
+        self.size = 1 << (max_entries.bit_length() - 1)
+        self.mask = self.size - 1
+        self.entries = [None] * self.size
+        self.generation = 0
+
+
+    def new_search(self):
+        """Start a new search; entries from older searches become the first to be replaced."""
+        self.generation += 1
+
+
+    def clear(self):
+        """Drop every entry."""
+        self.entries = [None] * self.size
+        self.generation = 0
+
+
+    def probe(self, key):
+        """Get the entry stored for a position key, or None."""
+        entry = self.entries[key & self.mask]
+        if entry is not None and entry[0] == key:
+            return entry
+        return None
+
+
+    def store(self, key, depth, bound, score, best_move):
+        """
+        Store a search result. An occupied slot is only overwritten by the same position,
+        an entry from an older search, or a result searched at least as deep.
+        """
+        index = key & self.mask
+        existing = self.entries[index]
+        if existing is not None and existing[0] != key and existing[5] == self.generation and existing[1] > depth:
+            return
+        if best_move is None and existing is not None and existing[0] == key:
+            best_move = existing[4]  # Keep the previous best move for ordering
+        self.entries[index] = (key, depth, bound, score, best_move, self.generation)
+
+
+# Packed shared-memory entries: score and flags in one word, the best move in another
+SCORE_INFINITY = (1 << 31) - 1  # Stands for float('inf'), stored when a side had no moves
+SCORE_OFFSET = 1 << 31
+MOVE_PLACEMENT = 1
+MOVE_PIECE = 2
+
+
+def encode_move(move):
+    """
+    Pack a move into an integer, 0 for no move. Bits 0-1 hold the kind, placements store the
+    piece type in bits 2-4 and every coordinate takes 8 bits from bit 8 on.
+    """
+    if move is None:
+        return 0
+    origin, destination = move
+    if origin is None:
+        row, col, piece_type = destination
+        return MOVE_PLACEMENT | PIECE_TYPES.index(piece_type) << 2 | row << 8 | col << 16
+    return MOVE_PIECE | origin[0] << 8 | origin[1] << 16 | destination[0] << 24 | destination[1] << 32
+
+
+def decode_move(code):
+    """Unpack a move packed by encode_move."""
+    kind = code & 3
+    if kind == MOVE_PLACEMENT:
+        return None, ((code >> 8) & 0xFF, (code >> 16) & 0xFF, PIECE_TYPES[(code >> 2) & 7])
+    if kind == MOVE_PIECE:
+        return ((code >> 8) & 0xFF, (code >> 16) & 0xFF), ((code >> 24) & 0xFF, (code >> 32) & 0xFF)
+    return None
+
+
+class SharedTranspositionTable:
+    """
+    TranspositionTable held in multiprocessing.shared_memory so several processes search with one table.
+    Each slot is three 64-bit words: a check word, the data word (score, depth, bound, generation)
+    and the encoded best move. Writes take no lock; the check word is key ^ data ^ move, so an entry
+    torn by two processes writing at once no longer matches its key and is ignored by probe.
+    """
+
+    ENTRY_SIZE_BYTES = 24
+
+    def __init__(self, max_megabytes=16, name=None):
+        """
+        Args:
+            max_megabytes: Size of the table, which must match between the processes sharing it.
+            name: Name of an existing table to attach to; a new one is created when None.
+        """
+        max_entries = max(1, (max_megabytes * 1024 * 1024) // self.ENTRY_SIZE_BYTES)
+        self.size = 1 << (max_entries.bit_length() - 1)
+        self.mask = self.size - 1
+        self.owner = name is None
+        if self.owner:
+            self.memory = shared_memory.SharedMemory(create=True, size=self.size * self.ENTRY_SIZE_BYTES)
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+        self.name = self.memory.name
+        self.slots = self.memory.buf.cast('Q')
+        # Kept per process; searches that cooperate are given the same generation
+        self.generation = 0
+
+
+    def new_search(self):
+        """Start a new search; entries from older searches become the first to be replaced."""
+        self.generation = (self.generation + 1) & 0xFF
+
+
+    def clear(self):
+        """Drop every entry."""
+        self.memory.buf[:] = bytes(len(self.memory.buf))
+        self.generation = 0
+
+
+    def probe(self, key):
+        """Get the entry stored for a position key as (key, depth, bound, score, best_move, generation), or None."""
+        index = (key & self.mask) * 3
+        data = self.slots[index + 1]
+        move = self.slots[index + 2]
+        if self.slots[index] ^ data ^ move != key or data == 0:
+            return None
+        score = (data & 0xFFFFFFFF) - SCORE_OFFSET
+        if abs(score) == SCORE_INFINITY:
+            score = float('inf') if score > 0 else float('-inf')
+        return key, (data >> 32) & 0xFF, (data >> 40) & 3, score, decode_move(move), data >> 48
+
+
+    def store(self, key, depth, bound, score, best_move):
+        """Store a search result, with the same replacement rules as TranspositionTable.store."""
+        index = (key & self.mask) * 3
+        existing_data = self.slots[index + 1]
+        existing_move = self.slots[index + 2]
+        same_key = self.slots[index] ^ existing_data ^ existing_move == key
+        if not same_key and existing_data >> 48 == self.generation and (existing_data >> 32) & 0xFF > depth:
+            return
+        move = encode_move(best_move)
+        if move == 0 and same_key:
+            move = existing_move  # Keep the previous best move for ordering
+
+        if score == float('inf'):
+            score = SCORE_INFINITY
+        elif score == float('-inf'):
+            score = -SCORE_INFINITY
+        data = (int(score) + SCORE_OFFSET) | min(depth, 0xFF) << 32 | bound << 40 | self.generation << 48
+        self.slots[index + 1] = data
+        self.slots[index + 2] = move
+        self.slots[index] = key ^ data ^ move
+
+
+    def close(self):
+        """Detach from the shared memory; the process that created the table also frees it."""
+        self.slots.release()
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
@@ -0,0 +1,66 @@
+import random
+from functools import lru_cache
+
+from board import PIECE_TYPES
+
+PLAYERS = ("Player 1", "Player 2")
+MAX_STACK_HEIGHT = 5  # A ground piece with all four beetles on top
+MAX_PIECES_IN_HAND = 3
+ZOBRIST_SEED = 0x48495645  # Fixed so keys are identical across processes and runs
+
+
+class ZobristKeys:
+    """
+    Random 64-bit keys for every feature of a position:
+    - a piece (player, piece_type) at a cell and stack height,
+    - the number of pieces of each type a player still has in hand,
+    - Player 2 being the side to move.
+    """
+
+    def __init__(self, board_size, seed=ZOBRIST_SEED):
+        rng = random.Random(seed)
+        # piece_keys[row][col][height - 1][(player, piece_type)]
+        self.piece_keys = [
+            [
+                [
+                    {(player, piece_type): rng.getrandbits(64) for player in PLAYERS for piece_type in PIECE_TYPES}
+                    for _ in range(MAX_STACK_HEIGHT)
+                ]
+                for _ in range(board_size)
+            ]
+            for _ in range(board_size)
+        ]
+        # hand_keys[player][piece_type][count]
+        self.hand_keys = {
+            player: {
+                piece_type: [rng.getrandbits(64) for _ in range(MAX_PIECES_IN_HAND + 1)]
+                for piece_type in PIECE_TYPES
+            }
+            for player in PLAYERS
+        }
+        self.side_key = rng.getrandbits(64)
+
+
+    def compute_key(self, board_state, player_pieces, player_to_move):
+        """Compute the key of a position from scratch."""
+        key = 0
+        for row in range(board_state.board_size):
+            for col in range(board_state.board_size):
+                cell_content = board_state.board[row][col]
+                if cell_content is None:
+                    continue
+                stack = cell_content if isinstance(cell_content, list) else [cell_content]
+                for height, piece in enumerate(stack, start=1):
+                    key ^= self.piece_keys[row][col][height - 1][piece]
+        for player, pieces in player_pieces.items():
+            for piece_type, count in pieces.items():
+                key ^= self.hand_keys[player][piece_type][count]
+        if player_to_move == "Player 2":
+            key ^= self.side_key
+        return key
+
+
+@lru_cache(maxsize=None)
+def get_zobrist_keys(board_size):
+    """Get the shared key table for a board size."""
+    return ZobristKeys(board_size)